@@ -1,17 +1,32 @@
-import requests, json
+"""List an agent's documents with their ingestion status."""
+import argparse
+
+import requests, orjson
+
 TENANT = "demo-tenant"
 AGENT_ID = "9f807ac4-9928-49fa-b81b-7fe342c98c14"
 BASE = "http://127.0.0.1:8000"
 H = {"x-tenant-id": TENANT}
 
-r = requests.get(f"{BASE}/api/documents", headers=H, params={"agentId": AGENT_ID})
-docs = r.json()
-if isinstance(docs, list):
-    for d in docs:
-        did = str(d.get("id", "?"))[:12]
-        title = d.get("title", d.get("name", "?"))
-        status = d.get("status", "?")
-        created = str(d.get("createdAt", ""))[:19]
-        print(f"  {did}... | {title} | {status} | {created}")
-else:
-    print(json.dumps(docs, indent=2)[:500])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base", default=BASE, help="backend base URL")
+    parser.add_argument("--agent-id", default=AGENT_ID)
+    args = parser.parse_args()
+
+    r = requests.get(f"{args.base}/api/documents", headers=H, params={"agentId": args.agent_id})
+    docs = r.json()
+    if isinstance(docs, list):
+        for d in docs:
+            did = str(d.get("id", "?"))[:12]
+            title = d.get("title", d.get("name", "?"))
+            status = d.get("status", "?")
+            created = str(d.get("createdAt", ""))[:19]
+            print(f"  {did}... | {title} | {status} | {created}")
+    else:
+        print(orjson.dumps(docs, option=orjson.OPT_INDENT_2).decode()[:500])
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,19 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     SUPPORTED_LLMS: list[str] = ["groq", "openai", "gemini", "ollama"]
     DEFAULT_LLM: str = "groq"
+    # Pooled keep-alive connections to the LLM API
+    LLM_MAX_CONNECTIONS: int = 50
+    LLM_KEEPALIVE: int = 20
+    # Streamed tokens are coalesced into ~N-char chunks (1 disables)
+    LLM_STREAM_COALESCE_CHARS: int = 32
+    LLM_STREAM_COALESCE_MS: int = 40
+    # Size max_tokens to the question (256/512/768, capped by agent tokenLimit).
+    # Opt-in: a short question can still need a long answer.
+    DYNAMIC_MAX_TOKENS: bool = False
+    # Upper bound on retrieved context sent to the LLM (~4 chars per token)
+    MAX_CONTEXT_CHARS: int = 16000
+    # Phrase streamed before retrieval finishes (e.g. "One moment."); empty = off
+    STREAM_FILLER_TEXT: str = ""
 
     # TTS
     KOKORO_TTS_URL: str = "http://localhost:8880"
@@ -66,6 +79,24 @@ class Settings(BaseSettings):
     CHROMA_HOST: str = "localhost"
     CHROMA_PORT: int = 8030
 
+    # In-memory retrieval for small corpora (skips the Chroma query round-trip)
+    EMBED_INMEM: bool = False
+    EMBED_INMEM_TTL: int = 300
+    EMBED_INMEM_MAX_DOCS: int = 50000
+    EMBED_INMEM_MAX_AGENTS: int = 32
+    # Coalesce concurrent semantic queries into one multi-vector Chroma call
+    BATCH_SEARCH: bool = False
+    # Load the embedder, connect to Chroma and pre-open the Groq connection at
+    # startup (in the background) instead of on first query
+    WARMUP_RETRIEVAL: bool = True
+    # Answer paraphrased first-turn queries from recent results (cosine >= threshold)
+    SEMANTIC_CACHE: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 600
+    # Cache Groq answers for byte-identical prompts in Redis
+    LLM_CACHE: bool = False
+    LLM_CACHE_TTL: int = 86400
+
     # Credential encryption key (64-char hex)
     CREDENTIALS_ENCRYPTION_KEY: Optional[str] = None
 
@@ -3,6 +3,10 @@ Request-level middleware for VoiceFlow.
 
 - Attaches a unique X-Request-ID to every request/response for distributed tracing.
 - Logs method, path, status and duration for every request at INFO level.
+
+Written as plain ASGI middleware rather than BaseHTTPMiddleware: the latter
+runs each request in an extra task and pipes the body through a memory
+stream, which adds per-request overhead and can hold back streamed chunks.
 """
 from __future__ import annotations
 
@@ -10,30 +14,42 @@ import logging
 import time
 import uuid
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger("voiceflow.access")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Attach X-Request-ID and log each request with timing."""
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-        start = time.monotonic()
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        start = time.perf_counter_ns()
+        status_code = 500
 
-        response: Response = await call_next(request)
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
-        duration_ms = int((time.monotonic() - start) * 1000)
-        response.headers["X-Request-ID"] = request_id
+        await self.app(scope, receive, send_with_request_id)
 
+        duration_ms = (time.perf_counter_ns() - start) // 1_000_000
         logger.info(
             "%s %s %s %dms rid=%s",
-            request.method,
-            request.url.path,
-            response.status_code,
+            scope["method"],
+            scope["path"],
+            status_code,
             duration_ms,
             request_id,
         )
-        return response
@@ -0,0 +1,17 @@
+"""
+Response classes shared across the API.
+
+OrjsonResponse is installed as the app's default_response_class, so every
+route returning a dict/list is encoded with orjson instead of stdlib json.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson (compact output, non-str dict keys allowed)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -15,6 +15,7 @@ import csv
 import io
 import logging
 from datetime import datetime, timezone
+from urllib.parse import parse_qsl
 
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.responses import JSONResponse
@@ -320,7 +321,9 @@ async def amd_callback(campaign_id: str, request: Request):
     Twilio AsyncAmd status callback.
     Updates contact and campaign stats based on answering machine detection result.
     """
-    form = await request.form()
+    # Only two fields are needed: decode the urlencoded body directly rather
+    # than going through Starlette's form parser on every AMD result.
+    form = dict(parse_qsl((await request.body()).decode(), keep_blank_values=True))
     call_sid = form.get("CallSid", "")
     answered_by = form.get("AnsweredBy", "unknown")
 
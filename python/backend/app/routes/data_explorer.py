@@ -2,11 +2,11 @@
 /api/data-explorer — Visualise what's stored in Postgres, Redis, ChromaDB.
 Gives a complete picture of the system's data state.
 """
-import json
 import logging
 import os
+from itertools import islice
 
-import chromadb
+import orjson
 import redis
 from fastapi import APIRouter, Depends
 from sqlalchemy import func, select, text
@@ -15,10 +15,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth import AuthContext, get_auth
 from app.database import get_db
 from app.models import Tenant, User, Agent, Document, CallLog, RetrainingExample, Brand
+from app.services.rag_service import _get_chroma_client
 
 router = APIRouter()
 logger = logging.getLogger("voiceflow.data_explorer")
 
+_SAMPLE_LIMIT = 10
+# Max Redis keys listed by /redis; each listed key costs a TTL (and maybe GET) round-trip
+_REDIS_KEY_LIMIT = 500
+
 
 @router.get("/overview")
 async def data_overview(auth: AuthContext = Depends(get_auth), db: AsyncSession = Depends(get_db)):
@@ -36,10 +41,9 @@ async def data_overview(auth: AuthContext = Depends(get_auth), db: AsyncSession
     # ChromaDB
     chroma = {"collections": 0, "total_chunks": 0, "details": []}
     try:
-        host = os.getenv("CHROMA_HOST", "localhost")
-        port = int(os.getenv("CHROMA_PORT", "8030"))
-        client = chromadb.HttpClient(host=host, port=port)
-        client.heartbeat()
+        client = _get_chroma_client()
+        if client is None:
+            raise RuntimeError("not connected")
         collections = client.list_collections()
         chroma["collections"] = len(collections)
         for col in collections:
@@ -132,23 +136,25 @@ async def postgres_detail(auth: AuthContext = Depends(get_auth), db: AsyncSessio
 @router.get("/chromadb")
 async def chromadb_detail(auth: AuthContext = Depends(get_auth)):
     """Detailed ChromaDB data — collections, sample chunks, metadata."""
+    client = _get_chroma_client()
     try:
-        host = os.getenv("CHROMA_HOST", "localhost")
-        port = int(os.getenv("CHROMA_PORT", "8030"))
-        client = chromadb.HttpClient(host=host, port=port)
-        client.heartbeat()
+        if client is None:
+            raise RuntimeError("not connected")
+        collections = client.list_collections()
     except Exception as e:
         return {"error": f"ChromaDB unavailable: {e}"}
 
     collections_data = []
-    for col in client.list_collections():
-        col_info = {"name": col.name, "count": col.count(), "samples": []}
+    for col in collections:
+        col_info = {"name": col.name, "count": 0, "samples": []}
         try:
-            # Get a sample of chunks
-            data = col.peek(limit=10)
-            docs = data.get("documents", [])
-            metas = data.get("metadatas", [])
-            ids = data.get("ids", [])
+            # Get a sample of chunks; a short sample is the whole collection,
+            # so count() is only needed when the sample is full.
+            data = col.get(limit=_SAMPLE_LIMIT, include=["documents", "metadatas"])
+            docs = data.get("documents") or []
+            metas = data.get("metadatas") or []
+            ids = data.get("ids") or []
+            col_info["count"] = len(ids) if len(ids) < _SAMPLE_LIMIT else col.count()
             for i in range(len(ids)):
                 col_info["samples"].append({
                     "id": ids[i],
@@ -175,17 +181,19 @@ async def redis_detail(auth: AuthContext = Depends(get_auth)):
 
     result = {"jobs": [], "bm25_indexes": [], "conversations": [], "other_keys": []}
 
-    for key in r.scan_iter("*", count=500):
+    listed = 0
+    for key in islice(r.scan_iter("*", count=500), _REDIS_KEY_LIMIT):
+        listed += 1
         ttl = r.ttl(key)
         if key.startswith("job:"):
             try:
-                data = json.loads(r.get(key) or "{}")
+                data = orjson.loads(r.get(key) or "{}")
                 result["jobs"].append({"key": key, "ttl": ttl, **data})
             except Exception:
                 result["jobs"].append({"key": key, "ttl": ttl})
         elif key.startswith("bm25:"):
             try:
-                data = json.loads(r.get(key) or "{}")
+                data = orjson.loads(r.get(key) or "{}")
                 result["bm25_indexes"].append({
                     "key": key, "ttl": ttl,
                     "doc_count": len(data.get("documents", [])),
@@ -197,4 +205,5 @@ async def redis_detail(auth: AuthContext = Depends(get_auth)):
         else:
             result["other_keys"].append({"key": key, "ttl": ttl, "type": r.type(key)})
 
+    result["truncated"] = listed == _REDIS_KEY_LIMIT
     return result
@@ -13,6 +13,7 @@ from slowapi.util import get_remote_address
 from app.database import get_db
 from app.auth import AuthContext, get_auth
 from app.models import Agent
+from app.responses import OrjsonResponse
 from app.services.rag_service import (
     process_query,
     get_conversation_history,
@@ -48,14 +49,16 @@ async def rag_query(request: Request, body: dict, auth: AuthContext = Depends(ge
     # Full RAG pipeline: context injection → ChromaDB → policy scoring → prompt → Groq
     rag_result = await process_query(db, auth.tenant_id, agent_id, query, session_id)
 
-    return {
+    # Returned as a response object: the payload is plain JSON types, so
+    # FastAPI's jsonable_encoder walk on every query is skipped.
+    return OrjsonResponse({
         "response": rag_result.get("response", ""),
         "agentId": agent_id,
         "sessionId": session_id,
         "sources": rag_result.get("sources", []),
         "model": rag_result.get("model", ""),
         "documentsRetrieved": rag_result.get("documentsRetrieved", 0),
-    }
+    })
 
 
 @router.get("/conversation/{session_id}")
@@ -2,7 +2,6 @@
 /api/runner routes — mirrors Express src/routes/runner.ts
 POST /chat, GET /agent/:agentId, POST /audio
 """
-import json
 import logging
 from datetime import datetime, timezone
 
@@ -15,8 +14,9 @@ from slowapi.util import get_remote_address
 
 from app.database import get_db
 from app.auth import AuthContext, get_auth
-from app.models import Agent, CallLog
+from app.models import Agent
 from app.config import settings
+from app.services.interaction_log import log_interaction
 
 logger = logging.getLogger("voiceflow.runner")
 router = APIRouter()
@@ -51,24 +51,8 @@ async def chat(request: Request, request_data: dict, auth: AuthContext = Depends
     rag_result = await process_query(db, auth.tenant_id, agent_id, message, session_id)
     response_text = rag_result.get("response", "No response generated.")
 
-    # Log the interaction
-    try:
-        log = CallLog(
-            tenantId=auth.tenant_id,
-            agentId=agent_id,
-            callerPhone=None,
-            startedAt=chat_start,
-            endedAt=datetime.now(timezone.utc),
-            durationSeconds=0,
-            transcript=json.dumps([
-                {"role": "user", "content": message},
-                {"role": "assistant", "content": response_text},
-            ]),
-        )
-        db.add(log)
-        await db.commit()
-    except Exception:
-        logger.exception("Failed to persist chat log")
+    # Log the interaction (written in the background, off the response path)
+    log_interaction(auth.tenant_id, agent_id, message, response_text, started_at=chat_start)
 
     return {"response": response_text, "agentId": agent_id, "sessionId": session_id}
 
@@ -112,7 +96,7 @@ async def process_audio(
     # Step 1: Speech-to-text via Groq Whisper API
     transcript = ""
     try:
-        import httpx
+        from app.services.rag_service import get_llm_http_client
         groq_key = settings.GROQ_API_KEY
         # Try to get tenant-specific key
         try:
@@ -126,15 +110,15 @@ async def process_audio(
             pass
 
         if groq_key:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(
-                    "https://api.groq.com/openai/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {groq_key}"},
-                    files={"file": (audio.filename or "audio.webm", audio_bytes, audio.content_type or "audio/webm")},
-                    data={"model": "whisper-large-v3-turbo", "language": "en"},
-                )
-                if resp.status_code == 200:
-                    transcript = resp.json().get("text", "")
+            resp = await get_llm_http_client().post(
+                "https://api.groq.com/openai/v1/audio/transcriptions",
+                headers={"Authorization": f"Bearer {groq_key}"},
+                files={"file": (audio.filename or "audio.webm", audio_bytes, audio.content_type or "audio/webm")},
+                data={"model": "whisper-large-v3-turbo", "language": "en"},
+                timeout=30,
+            )
+            if resp.status_code == 200:
+                transcript = resp.json().get("text", "")
     except Exception as e:
         logger.warning("STT failed: %s", e)
 
@@ -152,19 +136,6 @@ async def process_audio(
     response_text = rag_result.get("response", "No response generated.")
 
     # Log
-    try:
-        log = CallLog(
-            tenantId=auth.tenant_id, agentId=agentId,
-            callerPhone=None, durationSeconds=0,
-            startedAt=datetime.now(timezone.utc), endedAt=datetime.now(timezone.utc),
-            transcript=json.dumps([
-                {"role": "user", "content": transcript},
-                {"role": "assistant", "content": response_text},
-            ]),
-        )
-        db.add(log)
-        await db.commit()
-    except Exception:
-        logger.exception("Failed to persist audio log")
+    log_interaction(auth.tenant_id, agentId, transcript, response_text)
 
     return {"transcript": transcript, "response": response_text, "agentId": agentId, "sessionId": sessionId}
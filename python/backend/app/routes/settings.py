@@ -13,7 +13,7 @@ from app.database import get_db
 from app.auth import AuthContext, get_auth
 from app.models import Tenant
 from app.config import settings
-from app.services.credentials import encrypt, decrypt_safe, mask
+from app.services.credentials import clear_decrypt_cache, encrypt, decrypt_safe, mask
 
 router = APIRouter()
 
@@ -108,6 +108,7 @@ async def save_twilio(body: dict, auth: AuthContext = Depends(get_auth), db: Asy
         "twilioCredentialsUpdatedAt": datetime.now(timezone.utc).isoformat(),
     }
     await db.commit()
+    clear_decrypt_cache()
     return {"success": True, "message": "Twilio credentials saved (encrypted).", "accountSid": account_sid}
 
 
@@ -135,6 +136,7 @@ async def delete_twilio(auth: AuthContext = Depends(get_auth), db: AsyncSession
             s.pop(k, None)
         tenant.settings = s
         await db.commit()
+        clear_decrypt_cache()
     return {"success": True, "message": "Twilio credentials removed."}
 
 
@@ -176,6 +178,7 @@ async def save_groq(body: dict, auth: AuthContext = Depends(get_auth), db: Async
         "groqKeyUpdatedAt": datetime.now(timezone.utc).isoformat(),
     }
     await db.commit()
+    clear_decrypt_cache()
 
     masked = mask(api_key, prefix_len=7, suffix_len=4)
     return {"success": True, "message": "Groq API key verified and saved (encrypted).", "maskedKey": masked}
@@ -212,4 +215,5 @@ async def delete_groq(auth: AuthContext = Depends(get_auth), db: AsyncSession =
             s.pop(k, None)
         tenant.settings = s
         await db.commit()
+        clear_decrypt_cache()
     return {"success": True, "message": "Groq API key removed. Using platform default."}
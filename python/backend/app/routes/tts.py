@@ -12,7 +12,6 @@ import base64
 import io
 import logging
 
-import edge_tts
 from fastapi import APIRouter, File, UploadFile
 from fastapi.responses import JSONResponse
 
@@ -92,6 +91,8 @@ def _voice_for_engine(voice_id: str, engine: str) -> str:
 
 
 async def _synthesise_edge(text: str, voice_id: str) -> dict | JSONResponse:
+    import edge_tts  # lazy: pulls in aiohttp, only needed for the cloud fallback
+
     edge_voice = resolve_edge_voice(voice_id)
     try:
         communicate = edge_tts.Communicate(text, edge_voice)
@@ -12,7 +12,6 @@ import logging
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from sqlalchemy import select
-from twilio.twiml.voice_response import VoiceResponse
 
 from app.database import AsyncSessionLocal
 from app.models import Agent
@@ -20,6 +19,10 @@ from app.models import Agent
 logger = logging.getLogger("voiceflow.inbound_router")
 router = APIRouter()
 
+_AGENT_NOT_FOUND_TWIML = (
+    b'<?xml version="1.0" encoding="UTF-8"?><Response><Say>Agent not found.</Say><Hangup /></Response>'
+)
+
 
 @router.post("/inbound/{agent_id}")
 async def inbound_router(agent_id: str, request: Request) -> Response:
@@ -29,10 +32,7 @@ async def inbound_router(agent_id: str, request: Request) -> Response:
         agent = result.scalar_one_or_none()
 
     if not agent:
-        resp = VoiceResponse()
-        resp.say("Agent not found.")
-        resp.hangup()
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_AGENT_NOT_FOUND_TWIML, media_type="application/xml")
 
     provider = (agent.telephony_provider or "twilio-gather").lower()
 
@@ -30,6 +30,7 @@ import logging
 import struct
 from datetime import datetime, timezone
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 
@@ -50,6 +51,25 @@ _INTERRUPT_RMS_THRESHOLD = 200.0    # Above this while speaking = barge-in
 _SILENCE_FRAMES_THRESHOLD = 20      # ~400ms at 20ms/frame → end of utterance
 _FRAME_SAMPLES = 320                # 20ms at 16kHz = 320 samples = 640 bytes
 
+# ── Server → client frames ───────────────────────────────────────────────────
+# Fixed frames are serialised once at import; per-chunk frames go through
+# orjson instead of send_json's stdlib json.dumps.
+_STATE_FRAMES = {
+    state: orjson.dumps({"type": "state", "state": state}).decode()
+    for state in ("listening", "thinking", "speaking")
+}
+_AUDIO_END_FRAME = orjson.dumps({"type": "audio_end"}).decode()
+_PONG_FRAME = orjson.dumps({"type": "pong"}).decode()
+
+
+async def _send_json(websocket: WebSocket, payload: dict) -> None:
+    await websocket.send_text(orjson.dumps(payload).decode())
+
+
+def _audio_frame(audio_chunk: bytes) -> str:
+    """Serialise one base64 WAV chunk for the browser."""
+    return orjson.dumps({"type": "audio", "data": base64.b64encode(audio_chunk).decode()}).decode()
+
 
 def _pcm_rms(pcm_bytes: bytes) -> float:
     """Compute RMS energy of 16-bit PCM samples."""
@@ -102,7 +122,7 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
     # Auth
     claims = _validate_ws_token(websocket)
     if not claims:
-        await websocket.send_json({"type": "error", "message": "Unauthorized"})
+        await _send_json(websocket, {"type": "error", "message": "Unauthorized"})
         await websocket.close(code=1008)
         return
 
@@ -111,13 +131,13 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
         result = await db.execute(select(Agent).where(Agent.id == agent_id))
         agent = result.scalar_one_or_none()
         if not agent:
-            await websocket.send_json({"type": "error", "message": "Agent not found"})
+            await _send_json(websocket, {"type": "error", "message": "Agent not found"})
             await websocket.close()
             return
         tenant_id = agent.tenantId
 
     if claims.get("tenantId") != tenant_id:
-        await websocket.send_json({"type": "error", "message": "Invalid tenant"})
+        await _send_json(websocket, {"type": "error", "message": "Invalid tenant"})
         await websocket.close(code=1008)
         return
 
@@ -152,14 +172,14 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
                 utterance, sample_rate=16000, engine="faster-whisper", groq_api_key=groq_key
             )
             if not transcript:
-                await websocket.send_json({"type": "state", "state": "listening"})
+                await websocket.send_text(_STATE_FRAMES["listening"])
                 return
 
-            await websocket.send_json({"type": "transcript", "text": transcript})
+            await _send_json(websocket, {"type": "transcript", "text": transcript})
             full_transcript.append({"role": "user", "content": transcript})
 
             # Thinking
-            await websocket.send_json({"type": "state", "state": "thinking"})
+            await websocket.send_text(_STATE_FRAMES["thinking"])
 
             # Streaming RAG
             from app.services.rag_service import process_query_streaming
@@ -174,11 +194,14 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
                         if isinstance(token, str):
                             response_parts.append(token)
                             yield token
+                        elif isinstance(token, dict) and "filler" in token:
+                            # Spoken only — kept out of the response text and transcript
+                            yield token["filler"] + " "
 
             # Speaking — stream TTS audio
             is_speaking = True
             interrupted.clear()
-            await websocket.send_json({"type": "state", "state": "speaking"})
+            await websocket.send_text(_STATE_FRAMES["speaking"])
 
             async for audio_chunk in _tts.synthesize_streaming(
                 text_stream=_token_gen(),
@@ -188,37 +211,37 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
                 if interrupted.is_set():
                     break
                 # Send audio as base64 WAV
-                audio_b64 = base64.b64encode(audio_chunk).decode()
-                await websocket.send_json({"type": "audio", "data": audio_b64})
+                await websocket.send_text(_audio_frame(audio_chunk))
 
             # Send full response text for display
             full_response = "".join(response_parts)
             if full_response:
-                await websocket.send_json({"type": "response", "text": full_response})
+                await _send_json(websocket, {"type": "response", "text": full_response})
                 full_transcript.append({"role": "assistant", "content": full_response})
 
-            await websocket.send_json({"type": "audio_end"})
+            await websocket.send_text(_AUDIO_END_FRAME)
 
         except Exception:
             logger.exception("[voice_live] pipeline error session=%s", session_id)
             try:
-                await websocket.send_json({"type": "error", "message": "Processing error"})
+                await _send_json(websocket, {"type": "error", "message": "Processing error"})
             except Exception:
                 pass
         finally:
             is_speaking = False
             try:
-                await websocket.send_json({"type": "state", "state": "listening"})
+                await websocket.send_text(_STATE_FRAMES["listening"])
             except Exception:
                 pass
 
     try:
-        await websocket.send_json({"type": "state", "state": "listening"})
+        await websocket.send_text(_STATE_FRAMES["listening"])
 
         async for raw in _ws_iter(websocket):
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                # ~50 frames/s per call: orjson keeps the decode off the hot path
+                msg = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 continue
 
             msg_type = msg.get("type", "")
@@ -239,7 +262,7 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
                         processing_task.cancel()
                     pcm_buffer.clear()
                     silence_frames = 0
-                    await websocket.send_json({"type": "state", "state": "listening"})
+                    await websocket.send_text(_STATE_FRAMES["listening"])
                     continue
 
                 # Skip buffering audio while agent is speaking
@@ -281,16 +304,16 @@ async def voice_live_ws(websocket: WebSocket, agent_id: str):
                     else:
                         tts_engine = "kokoro"
                         voice_id = new_voice
-                await websocket.send_json({"type": "config_ack", "voice": voice_id, "engine": tts_engine})
+                await _send_json(websocket, {"type": "config_ack", "voice": voice_id, "engine": tts_engine})
 
             elif msg_type == "interrupt":
                 if is_speaking:
                     interrupted.set()
                     is_speaking = False
-                    await websocket.send_json({"type": "state", "state": "listening"})
+                    await websocket.send_text(_STATE_FRAMES["listening"])
 
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text(_PONG_FRAME)
 
     except WebSocketDisconnect:
         logger.info("[voice_live] disconnected session=%s", session_id)
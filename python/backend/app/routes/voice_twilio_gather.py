@@ -8,6 +8,8 @@ import json
 import logging
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
 
 from fastapi import APIRouter, Depends, Request, BackgroundTasks
 from fastapi.responses import Response
@@ -19,6 +21,7 @@ from app.auth import AuthContext, get_auth
 from app.models import Agent, CallLog, Tenant
 from app.config import settings
 from app.services.credentials import decrypt_safe
+from app.services.twilio_rest import read_twilio_form
 
 # Pre-compiled pattern for extracting JSON from LLM markdown code blocks
 _JSON_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
@@ -27,11 +30,54 @@ _JSON_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
 _XML_TAG_RE = re.compile(r"<[^>]+>")
 
 
+@lru_cache(maxsize=1024)
 def _sanitize_for_twiml(text: str) -> str:
-    """Remove XML/SSML tags and escape special chars to prevent TwiML injection."""
-    text = _XML_TAG_RE.sub("", text)
-    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-    return text.strip() or "I'm sorry, I couldn't generate a response."
+    """
+    Remove XML/SSML tags and escape special chars to prevent TwiML injection.
+    Memoised: cached/repeated answers (FAQ hits, LLM cache) skip the regex walk.
+    """
+    if "<" in text:
+        text = _XML_TAG_RE.sub("", text)
+    text = text.strip()
+    return escape(text or "I'm sorry, I couldn't generate a response.")
+
+
+# Gather-loop TwiML is assembled from pre-encoded fragments: only the action
+# URL and the <Say> body change per request, so there is no VoiceResponse tree
+# to build and serialise on every webhook. Output matches twilio's serialiser.
+_TWIML_HEAD = b'<?xml version="1.0" encoding="UTF-8"?><Response>'
+_GATHER_OPEN = _TWIML_HEAD + b"<Gather action="
+_GATHER_SAY = (
+    b' input="dtmf speech" language="en-US" method="POST" numDigits="1"'
+    b' speechTimeout="auto"><Say voice="Polly.Joanna">'
+)
+_GATHER_NO_INPUT_TAIL = (
+    b"</Say></Gather><Say voice=\"Polly.Joanna\">I didn't hear anything. Goodbye.</Say>"
+    b"<Hangup /></Response>"
+)
+_GATHER_GOODBYE_TAIL = (
+    b'</Say></Gather><Say voice="Polly.Joanna">Thank you for calling. Goodbye.</Say>'
+    b"<Hangup /></Response>"
+)
+
+
+def _say_hangup_twiml(text: str) -> bytes:
+    return _TWIML_HEAD + b'<Say voice="Polly.Joanna">' + text.encode() + b"</Say><Hangup /></Response>"
+
+
+_AGENT_UNAVAILABLE_TWIML = _say_hangup_twiml("Sorry, the requested agent is not available.")
+_NOT_PROCESSED_TWIML = _say_hangup_twiml("I couldn't process that. Goodbye.")
+
+
+def _gather_twiml(agent_id: str, say_xml: str, tail: bytes) -> bytes:
+    """<Gather> posting back to /gather/{agent_id}; say_xml must already be escaped."""
+    return b"".join((
+        _GATHER_OPEN,
+        quoteattr(f"/api/voice/gather/{agent_id}").encode(),
+        _GATHER_SAY,
+        say_xml.encode(),
+        tail,
+    ))
 
 logger = logging.getLogger("voiceflow.gather")
 router = APIRouter()
@@ -72,26 +118,12 @@ async def handle_inbound_call(agent: Agent, request: Request) -> Response:
     Return TwiML <Gather> that greets the caller and collects speech.
     Called by voice_inbound_router when telephony_provider == 'twilio-gather'.
     """
-    from twilio.twiml.voice_response import VoiceResponse, Gather
-
     agent_name = agent.name or "your AI assistant"
-    resp = VoiceResponse()
-    gather = Gather(
-        input="dtmf speech",
-        action=f"/api/voice/gather/{agent.id}",
-        method="POST",
-        speech_timeout="auto",
-        language="en-US",
-        num_digits=1,
-    )
-    gather.say(
-        f"Hello, you've reached {agent_name}. How can I help you today?",
-        voice="Polly.Joanna",
+    greeting = escape(f"Hello, you've reached {agent_name}. How can I help you today?")
+    return Response(
+        content=_gather_twiml(agent.id, greeting, _GATHER_NO_INPUT_TAIL),
+        media_type="application/xml",
     )
-    resp.append(gather)
-    resp.say("I didn't hear anything. Goodbye.", voice="Polly.Joanna")
-    resp.hangup()
-    return Response(content=str(resp), media_type="application/xml")
 
 
 # ── Inbound call webhook (Twilio posts here for gather-loop agents) ──────────
@@ -101,8 +133,8 @@ async def voice_inbound(agent_id: str, request: Request, db: AsyncSession = Depe
     """
     Twilio Gather-loop inbound: validate signature, greet and collect speech.
     """
-    form = await request.form()
-    if not _validate_twilio_signature(request, dict(form)):
+    form = await read_twilio_form(request)
+    if not _validate_twilio_signature(request, form):
         logger.warning("[gather] invalid Twilio signature on /gather-inbound/%s", agent_id)
         return Response(content="Forbidden", status_code=403, media_type="text/plain")
 
@@ -110,12 +142,7 @@ async def voice_inbound(agent_id: str, request: Request, db: AsyncSession = Depe
     agent = result.scalar_one_or_none()
 
     if not agent:
-        from twilio.twiml.voice_response import VoiceResponse
-
-        resp = VoiceResponse()
-        resp.say("Sorry, the requested agent is not available.", voice="Polly.Joanna")
-        resp.hangup()
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_AGENT_UNAVAILABLE_TWIML, media_type="application/xml")
 
     return await handle_inbound_call(agent, request)
 
@@ -133,10 +160,8 @@ async def voice_gather(
     Twilio posts recognized speech here.
     Runs speech through the RAG pipeline and responds with TTS via TwiML <Say>.
     """
-    from twilio.twiml.voice_response import VoiceResponse, Gather
-
-    form = await request.form()
-    if not _validate_twilio_signature(request, dict(form)):
+    form = await read_twilio_form(request)
+    if not _validate_twilio_signature(request, form):
         logger.warning("[gather] invalid Twilio signature on /gather/%s", agent_id)
         return Response(content="Forbidden", status_code=403, media_type="text/plain")
 
@@ -151,12 +176,9 @@ async def voice_gather(
 
     result = await db.execute(select(Agent).where(Agent.id == agent_id))
     agent = result.scalar_one_or_none()
-    resp = VoiceResponse()
 
     if not agent or not speech_result:
-        resp.say("I couldn't process that. Goodbye.", voice="Polly.Joanna")
-        resp.hangup()
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_NOT_PROCESSED_TWIML, media_type="application/xml")
 
     # Run RAG pipeline
     from app.services.rag_service import process_query
@@ -206,20 +228,10 @@ async def voice_gather(
         pass
 
     # Re-gather for multi-turn conversation
-    gather = Gather(
-        input="dtmf speech",
-        action=f"/api/voice/gather/{agent_id}",
-        method="POST",
-        speech_timeout="auto",
-        language="en-US",
-        num_digits=1,
+    return Response(
+        content=_gather_twiml(agent_id, _sanitize_for_twiml(answer), _GATHER_GOODBYE_TAIL),
+        media_type="application/xml",
     )
-    gather.say(_sanitize_for_twiml(answer), voice="Polly.Joanna")
-    resp.append(gather)
-    resp.say("Thank you for calling. Goodbye.", voice="Polly.Joanna")
-    resp.hangup()
-
-    return Response(content=str(resp), media_type="application/xml")
 
 
 # ── Post-call LLM analysis (Claim 12) ───────────────────────────────────────
@@ -253,7 +265,7 @@ async def analyze_call(call_log_id: str, tenant_id: str):
                 logger.warning("No Groq key for post-call analysis")
                 return
 
-            import httpx
+            from app.services.rag_service import get_llm_http_client
             analysis_prompt = f"""Analyze this customer service call transcript. Return a JSON object with:
 - "sentiment": overall sentiment (positive/neutral/negative)
 - "intent": primary caller intent in 1-2 sentences
@@ -265,43 +277,44 @@ async def analyze_call(call_log_id: str, tenant_id: str):
 Transcript:
 {transcript}"""
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {groq_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": "llama-3.1-8b-instant",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "You are a call analysis assistant. Return valid JSON only.",
-                            },
-                            {"role": "user", "content": analysis_prompt},
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 1024,
-                    },
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    content = data["choices"][0]["message"]["content"]
-                    try:
-                        analysis = json.loads(content)
-                    except json.JSONDecodeError:
-                        match = _JSON_CODE_BLOCK_RE.search(content)
-                        if match:
-                            analysis = json.loads(match.group(1))
-                        else:
-                            analysis = {"summary": content, "sentiment": "unknown"}
-
-                    log.analysis = analysis
-                    await db.commit()
-                    logger.info("Post-call analysis completed for call %s", call_log_id)
-                else:
-                    logger.warning("Groq API returned %s for call analysis", resp.status_code)
+            # Pooled Groq client shared with the RAG pipeline
+            resp = await get_llm_http_client().post(
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {groq_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": "llama-3.1-8b-instant",
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are a call analysis assistant. Return valid JSON only.",
+                        },
+                        {"role": "user", "content": analysis_prompt},
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 1024,
+                },
+                timeout=30,
+            )
+            if resp.status_code == 200:
+                data = resp.json()
+                content = data["choices"][0]["message"]["content"]
+                try:
+                    analysis = json.loads(content)
+                except json.JSONDecodeError:
+                    match = _JSON_CODE_BLOCK_RE.search(content)
+                    if match:
+                        analysis = json.loads(match.group(1))
+                    else:
+                        analysis = {"summary": content, "sentiment": "unknown"}
+
+                log.analysis = analysis
+                await db.commit()
+                logger.info("Post-call analysis completed for call %s", call_log_id)
+            else:
+                logger.warning("Groq API returned %s for call analysis", resp.status_code)
 
         except Exception:
             logger.exception("Post-call analysis failed for %s", call_log_id)
@@ -312,7 +325,7 @@ Transcript:
 @router.post("/gather-status/{agent_id}")
 async def voice_status(agent_id: str, request: Request):
     """Twilio status callback for Gather-loop agents."""
-    form = await request.form()
+    form = await read_twilio_form(request)
     call_status = form.get("CallStatus", "unknown")
     call_sid = form.get("CallSid", "")
     logger.info("Gather call %s agent=%s status=%s", call_sid, agent_id, call_status)
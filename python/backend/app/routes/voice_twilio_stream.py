@@ -14,7 +14,9 @@ import json
 import logging
 import struct
 from datetime import datetime, timezone
+from xml.sax.saxutils import quoteattr
 
+import orjson
 import redis.asyncio as aioredis
 from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse, Response
@@ -28,6 +30,7 @@ from app.models import Agent, CallLog, Tenant
 from app.services.credentials import decrypt_safe
 from app.services.stt_service import stt_service
 from app.services.tts_router import TTSRouter
+from app.services.twilio_rest import read_twilio_form
 
 logger = logging.getLogger("voiceflow.twilio_stream")
 router = APIRouter()
@@ -40,6 +43,45 @@ _INTERRUPT_RMS_THRESHOLD = 300.0    # energy threshold to detect user speaking o
 _FRAME_BYTES = 160                  # 20ms of 8kHz μ-law = 160 bytes
 
 
+def _media_frame(stream_sid: str, frame: bytes) -> str:
+    """Serialise one outbound Twilio media event (sent every 20 ms while speaking)."""
+    return orjson.dumps({
+        "event": "media",
+        "streamSid": stream_sid,
+        "media": {"payload": base64.b64encode(frame).decode()},
+    }).decode()
+
+
+# ── TwiML ───────────────────────────────────────────────────────────────────
+# <Connect><Stream> responses are joined from pre-encoded fragments; only the
+# host-derived URLs and stream parameters are formatted per request (same
+# output as twilio's VoiceResponse serialiser, without building the tree).
+
+_TWIML_HEAD = b'<?xml version="1.0" encoding="UTF-8"?><Response>'
+_RECORD_ATTRS = b' playBeep="false" recordingChannels="mono" recordingStatusCallback='
+_RECORD_TAIL = b' recordingStatusCallbackMethod="POST" timeout="0" />'
+_STREAM_TAIL = b"</Stream></Connect></Response>"
+_AGENT_NOT_FOUND_TWIML = _TWIML_HEAD + b"<Say>Agent not found.</Say><Hangup /></Response>"
+_HANGUP_TWIML = _TWIML_HEAD + b"<Hangup /></Response>"
+
+
+def _attr(value: str) -> bytes:
+    return quoteattr(value).encode()
+
+
+def _stream_twiml(host: str, agent_id: str, params: dict, recording_url: str | None = None) -> bytes:
+    """TwiML that optionally starts recording, then connects the call to the media WS."""
+    parts = [_TWIML_HEAD]
+    if recording_url:
+        rec = _attr(recording_url)
+        parts += (b"<Record action=", rec, _RECORD_ATTRS, rec, _RECORD_TAIL)
+    parts += (b"<Connect><Stream url=", _attr(f"wss://{host}/api/voice/media-stream/{agent_id}"), b">")
+    for name, value in params.items():
+        parts += (b"<Parameter name=", _attr(name), b" value=", _attr(str(value)), b" />")
+    parts.append(_STREAM_TAIL)
+    return b"".join(parts)
+
+
 # ── Redis helper ─────────────────────────────────────────────────────────────
 
 def _redis_client() -> aioredis.Redis:
@@ -113,37 +155,20 @@ def _validate_twilio_signature(request: Request, form_data: dict) -> bool:
 
 async def handle_inbound_call(agent: Agent, request: Request) -> Response:
     """Return TwiML <Connect><Stream> with optional call recording for the given agent."""
-    from twilio.twiml.voice_response import VoiceResponse, Connect, Stream, Record
-
     proto = request.headers.get("x-forwarded-proto", "https")
     host = request.headers.get("host", "localhost")
-    ws_url = f"wss://{host}/api/voice/media-stream/{agent.id}"
     recording_status_url = f"{proto}://{host}/api/voice/recording-status/{agent.id}"
 
-    resp = VoiceResponse()
     # Start call recording — store recording URL via status callback
-    resp.record(
-        action=recording_status_url,
-        recording_status_callback=recording_status_url,
-        recording_status_callback_method="POST",
-        recording_channels="mono",
-        timeout=0,
-        play_beep=False,
-    )
-    connect = Connect()
-    stream = Stream(url=ws_url)
-    stream.parameter(name="agentId", value=agent.id)
-    connect.append(stream)
-    resp.append(connect)
-
-    return Response(content=str(resp), media_type="application/xml")
+    twiml = _stream_twiml(host, agent.id, {"agentId": agent.id}, recording_url=recording_status_url)
+    return Response(content=twiml, media_type="application/xml")
 
 
 @router.post("/inbound/{agent_id}")
 async def voice_inbound(agent_id: str, request: Request):
     """Twilio inbound webhook — validates signature then returns Media Stream TwiML."""
-    form = await request.form()
-    if not _validate_twilio_signature(request, dict(form)):
+    form = await read_twilio_form(request)
+    if not _validate_twilio_signature(request, form):
         logger.warning("[twilio_stream] invalid Twilio signature on /inbound/%s", agent_id)
         return Response(content="Forbidden", status_code=403, media_type="text/plain")
 
@@ -152,12 +177,7 @@ async def voice_inbound(agent_id: str, request: Request):
         agent = result.scalar_one_or_none()
 
     if not agent:
-        from twilio.twiml.voice_response import VoiceResponse
-
-        resp = VoiceResponse()
-        resp.say("Agent not found.")
-        resp.hangup()
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_AGENT_NOT_FOUND_TWIML, media_type="application/xml")
 
     return await handle_inbound_call(agent, request)
 
@@ -172,16 +192,13 @@ async def voice_outbound(agent_id: str, request: Request):
       stream parameters, return <Connect><Stream> TwiML.
     - machine_*/fax: hang up.
     """
-    form = await request.form()
+    form = await read_twilio_form(request)
     answered_by = (form.get("AnsweredBy") or "").lower()
     call_sid = form.get("CallSid", "")
 
     if answered_by.startswith("machine") or answered_by == "fax":
-        from twilio.twiml.voice_response import VoiceResponse
-        resp = VoiceResponse()
-        resp.hangup()
         logger.info("[twilio_stream] AMD machine detected — hanging up call=%s", call_sid)
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_HANGUP_TWIML, media_type="application/xml")
 
     contact_id = request.query_params.get("contact_id", "")
 
@@ -203,37 +220,22 @@ async def voice_outbound(agent_id: str, request: Request):
                     contact_vars.update(contact.variables)
 
     if not agent:
-        from twilio.twiml.voice_response import VoiceResponse
-        resp = VoiceResponse()
-        resp.say("Agent not found.")
-        resp.hangup()
-        return Response(content=str(resp), media_type="application/xml")
+        return Response(content=_AGENT_NOT_FOUND_TWIML, media_type="application/xml")
 
-    from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
-    proto = request.headers.get("x-forwarded-proto", "https")
     host = request.headers.get("host", "localhost")
-    ws_url = f"wss://{host}/api/voice/media-stream/{agent.id}"
-
-    resp = VoiceResponse()
-    connect = Connect()
-    stream = Stream(url=ws_url)
-    stream.parameter(name="agentId", value=agent.id)
-    for key, value in contact_vars.items():
-        stream.parameter(name=key, value=str(value))
-    connect.append(stream)
-    resp.append(connect)
+    twiml = _stream_twiml(host, agent.id, {**contact_vars, "agentId": agent.id})
 
     logger.info(
         "[twilio_stream] outbound answered call=%s agent=%s contact_vars=%s",
         call_sid, agent_id, list(contact_vars.keys()),
     )
-    return Response(content=str(resp), media_type="application/xml")
+    return Response(content=twiml, media_type="application/xml")
 
 
 @router.post("/recording-status/{agent_id}")
 async def recording_status(agent_id: str, request: Request):
     """Twilio recording status callback — persist recording URL in CallLog."""
-    form = await request.form()
+    form = await read_twilio_form(request)
     recording_url = form.get("RecordingUrl", "")
     call_sid = form.get("CallSid", "")
     recording_status = form.get("RecordingStatus", "")
@@ -270,7 +272,7 @@ async def recording_status(agent_id: str, request: Request):
 @router.post("/status/{agent_id}")
 async def voice_status(agent_id: str, request: Request):
     """Twilio status callback — log call status."""
-    form = await request.form()
+    form = await read_twilio_form(request)
     call_sid = form.get("CallSid", "")
     call_status = form.get("CallStatus", "unknown")
     duration = form.get("CallDuration", "0")
@@ -333,11 +335,24 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
         pending_tasks.add(task)
         task.add_done_callback(pending_tasks.discard)
 
+    # One utterance pipeline at a time per call: a caller who keeps talking
+    # queues turns instead of running overlapping STT → RAG → TTS pipelines
+    # that compete for the loop and interleave audio on the same stream.
+    utterance_sem = asyncio.Semaphore(1)
+
+    async def _one_at_a_time(coro) -> None:
+        try:
+            async with utterance_sem:
+                await coro
+        finally:
+            coro.close()  # no-op once run; avoids "never awaited" if cancelled while queued
+
     try:
         async for raw in _ws_iter(websocket):
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                # ~50 frames/s per call: orjson keeps the decode off the hot path
+                msg = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 continue
 
             event = msg.get("event", "")
@@ -359,12 +374,12 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
                     agent_id, stream_sid, call_sid,
                 )
                 # Store session in Redis (expire in 1 hour)
-                session_data = json.dumps({
+                session_data = orjson.dumps({
                     "agentId": agent_id,
                     "tenantId": tenant_id,
                     "streamSid": stream_sid,
                     "callSid": call_sid,
-                }).encode()
+                })
                 await redis.setex(f"stream:{stream_sid}", 3600, session_data)
                 # Reverse index: callSid → streamSid (for efficient transfer lookup)
                 if call_sid:
@@ -402,7 +417,7 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
                     silence_frames = 0
 
                     # Background pipeline: STT → RAG → TTS → send
-                    _track_task(
+                    _track_task(_one_at_a_time(
                         _handle_utterance(
                             websocket=websocket,
                             utterance=utterance,
@@ -416,7 +431,7 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
                             full_transcript=full_transcript,
                             agent_speaking_event=agent_speaking_event,
                         )
-                    )
+                    ))
 
             elif event == "stop":
                 logger.info("[twilio_stream] stop agent=%s stream=%s", agent_id, stream_sid)
@@ -451,6 +466,9 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
                                 if isinstance(token, str):
                                     dtmf_response_parts.append(token)
                                     yield token
+                                elif isinstance(token, dict) and "filler" in token:
+                                    # Spoken only — kept out of the response text and transcript
+                                    yield token["filler"] + " "
 
                     agent_speaking_event.set()
                     try:
@@ -459,17 +477,12 @@ async def media_stream_ws(websocket: WebSocket, agent_id: str):
                             engine=tts_engine,
                             voice_id=voice_id,
                         ):
-                            mulaw_chunk = _tts._wav_to_mulaw_8khz_mono(audio_chunk)
+                            mulaw_chunk = await _tts.wav_to_mulaw(audio_chunk)
                             for i in range(0, len(mulaw_chunk), _FRAME_BYTES):
                                 if not agent_speaking_event.is_set():
                                     break
                                 frame = mulaw_chunk[i : i + _FRAME_BYTES]
-                                payload_b64 = base64.b64encode(frame).decode()
-                                await websocket.send_text(json.dumps({
-                                    "event": "media",
-                                    "streamSid": stream_sid,
-                                    "media": {"payload": payload_b64},
-                                }))
+                                await websocket.send_text(_media_frame(stream_sid, frame))
                                 await asyncio.sleep(0.02)
                             if not agent_speaking_event.is_set():
                                 break
@@ -561,6 +574,9 @@ async def _handle_utterance(
                 if isinstance(token, str):
                     full_response_parts.append(token)
                     yield token
+                elif isinstance(token, dict) and "filler" in token:
+                    # Spoken only — kept out of the response text and transcript
+                    yield token["filler"] + " "
 
     # 3. Stream TTS audio as sentences complete
     agent_speaking_event.set()
@@ -571,18 +587,13 @@ async def _handle_utterance(
             voice_id=voice_id,
         ):
             # Convert WAV audio chunk to μ-law 8kHz for Twilio
-            mulaw_chunk = _tts._wav_to_mulaw_8khz_mono(audio_chunk)
+            mulaw_chunk = await _tts.wav_to_mulaw(audio_chunk)
             # Stream μ-law in 20ms frames
             for i in range(0, len(mulaw_chunk), _FRAME_BYTES):
                 if not agent_speaking_event.is_set():
                     break  # interrupted
                 frame = mulaw_chunk[i : i + _FRAME_BYTES]
-                payload_b64 = base64.b64encode(frame).decode()
-                await websocket.send_text(json.dumps({
-                    "event": "media",
-                    "streamSid": stream_sid,
-                    "media": {"payload": payload_b64},
-                }))
+                await websocket.send_text(_media_frame(stream_sid, frame))
                 await asyncio.sleep(0.02)  # 20ms pacing
             if not agent_speaking_event.is_set():
                 break  # interrupted mid-sentence
@@ -609,22 +620,17 @@ async def _stream_mulaw_to_twilio(
         if not agent_speaking_event.is_set():
             break
         chunk = mulaw_bytes[i : i + _FRAME_BYTES]
-        payload_b64 = base64.b64encode(chunk).decode()
-        await websocket.send_text(json.dumps({
-            "event": "media",
-            "streamSid": stream_sid,
-            "media": {"payload": payload_b64},
-        }))
+        await websocket.send_text(_media_frame(stream_sid, chunk))
         await asyncio.sleep(0.02)  # maintain 20ms pacing
 
 
 async def _send_clear(websocket: WebSocket, stream_sid: str) -> None:
     """Send Twilio clear event to flush audio buffer."""
     try:
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(orjson.dumps({
             "event": "clear",
             "streamSid": stream_sid,
-        }))
+        }).decode())
     except Exception:
         pass
 
@@ -700,8 +706,8 @@ async def transfer_call(
             raw = await redis.get(f"stream:{stream_sid_str}")
             if raw:
                 try:
-                    session_data = json.loads(raw)
-                except json.JSONDecodeError:
+                    session_data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
                     logger.warning(
                         "[twilio_stream] corrupt session data for call=%s stream=%s",
                         call_sid, stream_sid_str,
@@ -740,19 +746,16 @@ async def transfer_call(
     if not twilio_sid or not twilio_token:
         return JSONResponse({"error": "Twilio credentials not configured"}, status_code=503)
 
-    # 4. Build <Dial> TwiML and send to Twilio REST API
-    import httpx
+    # 4. Build <Dial> TwiML and send to Twilio REST API (pooled keep-alive client)
+    from app.services.twilio_rest import twilio_post
 
     dial_twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response><Dial>{transfer_to}</Dial></Response>"""
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                f"https://api.twilio.com/2010-04-01/Accounts/{twilio_sid}/Calls/{call_sid}.json",
-                auth=(twilio_sid, twilio_token),
-                data={"Twiml": dial_twiml},
-            )
+        resp = await twilio_post(
+            twilio_sid, twilio_token, f"Calls/{call_sid}.json", {"Twiml": dial_twiml}
+        )
         if resp.status_code in (200, 204):
             logger.info("[twilio_stream] transfer call=%s to=%s", call_sid, transfer_to)
             return JSONResponse({"status": "transferred", "transferTo": transfer_to})
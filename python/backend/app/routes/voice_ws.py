@@ -5,57 +5,34 @@ Browser sends audio chunks over WebSocket -> STT -> RAG -> TTS audio back.
 
 import base64
 import io
-import json
 import logging
 import wave
 from datetime import datetime, timezone
 
 import jwt as pyjwt
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 
 from app.database import AsyncSessionLocal
-from app.models import Agent, CallLog, Tenant
+from app.models import Agent, Tenant
 from app.config import settings
 from app.services.credentials import decrypt_safe
+from app.services.interaction_log import log_interaction
+from app.services.stt_service import stt_service
 
 logger = logging.getLogger("voiceflow.voice_ws")
 router = APIRouter()
 
-# Try to load faster-whisper for local STT; fall back to Groq Whisper API
-_whisper_model = None
-_whisper_available = False
 
-try:
-    from faster_whisper import WhisperModel
-
-    _whisper_model = WhisperModel("tiny", device="cpu", compute_type="int8")
-    _whisper_available = True
-    logger.info("faster-whisper loaded (local STT enabled)")
-except ImportError:
-    logger.info("faster-whisper not installed; will use Groq Whisper API for STT")
-except Exception as e:
-    logger.warning(f"faster-whisper init failed: {e}; will use Groq Whisper API")
-
-
-async def _transcribe_local(audio_bytes: bytes) -> str:
-    """Transcribe using local faster-whisper model."""
-    if not _whisper_model:
-        return ""
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(16000)
-        wf.writeframes(audio_bytes)
-    buf.seek(0)
-    segments, _ = _whisper_model.transcribe(buf, language="en")
-    return " ".join(seg.text for seg in segments).strip()
+async def _send_json(websocket: WebSocket, payload: dict) -> None:
+    """send_json via orjson — audio frames carry whole base64 data URIs."""
+    await websocket.send_text(orjson.dumps(payload).decode())
 
 
 async def _transcribe_groq(audio_bytes: bytes, groq_key: str) -> str:
     """Transcribe using Groq's Whisper API endpoint."""
-    import httpx
+    from app.services.rag_service import get_llm_http_client
 
     buf = io.BytesIO()
     with wave.open(buf, "wb") as wf:
@@ -65,16 +42,17 @@ async def _transcribe_groq(audio_bytes: bytes, groq_key: str) -> str:
         wf.writeframes(audio_bytes)
     buf.seek(0)
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            "https://api.groq.com/openai/v1/audio/transcriptions",
-            headers={"Authorization": f"Bearer {groq_key}"},
-            files={"file": ("audio.wav", buf, "audio/wav")},
-            data={"model": "whisper-large-v3-turbo", "language": "en"},
-        )
-        if resp.status_code == 200:
-            return resp.json().get("text", "")
-        logger.warning(f"Groq Whisper API returned {resp.status_code}")
+    # Pooled Groq client — per-utterance calls skip the TLS handshake
+    resp = await get_llm_http_client().post(
+        "https://api.groq.com/openai/v1/audio/transcriptions",
+        headers={"Authorization": f"Bearer {groq_key}"},
+        files={"file": ("audio.wav", buf, "audio/wav")},
+        data={"model": "whisper-large-v3-turbo", "language": "en"},
+        timeout=30,
+    )
+    if resp.status_code == 200:
+        return resp.json().get("text", "")
+    logger.warning(f"Groq Whisper API returned {resp.status_code}")
     return ""
 
 
@@ -135,7 +113,7 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
     await websocket.accept()
     claims = _validate_ws_token(websocket)
     if not claims:
-        await websocket.send_json({"type": "error", "message": "Unauthorized"})
+        await _send_json(websocket, {"type": "error", "message": "Unauthorized"})
         await websocket.close(code=1008)
         return
 
@@ -144,14 +122,14 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
         result = await db.execute(select(Agent).where(Agent.id == agent_id))
         agent = result.scalar_one_or_none()
         if not agent:
-            await websocket.send_json({"type": "error", "message": "Agent not found"})
+            await _send_json(websocket, {"type": "error", "message": "Agent not found"})
             await websocket.close()
             return
         tenant_id = agent.tenantId
 
     # Enforce tenant match from JWT on every WS connection
     if claims.get("tenantId") != tenant_id:
-        await websocket.send_json({"type": "error", "message": "Invalid tenant token"})
+        await _send_json(websocket, {"type": "error", "message": "Invalid tenant token"})
         await websocket.close(code=1008)
         return
 
@@ -166,8 +144,8 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
         while True:
             raw = await websocket.receive_text()
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 continue
 
             msg_type = msg.get("type", "")
@@ -175,7 +153,7 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
             if msg_type == "config":
                 vid = msg.get("voiceId", "")
                 if not vid:
-                    await websocket.send_json({"type": "config_ack", "voice": selected_voice, "engine": selected_engine})
+                    await _send_json(websocket, {"type": "config_ack", "voice": selected_voice, "engine": selected_engine})
                     continue
 
                 from app.routes.tts import resolve_edge_voice
@@ -186,7 +164,7 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
                 else:
                     selected_voice = _cpu_voice_id(vid, selected_engine)
 
-                await websocket.send_json({"type": "config_ack", "voice": selected_voice, "engine": selected_engine})
+                await _send_json(websocket, {"type": "config_ack", "voice": selected_voice, "engine": selected_engine})
 
             elif msg_type == "audio":
                 chunk = base64.b64decode(msg.get("data", ""))
@@ -194,26 +172,26 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
 
             elif msg_type == "end":
                 if not audio_buffer:
-                    await websocket.send_json({"type": "error", "message": "No audio received"})
+                    await _send_json(websocket, {"type": "error", "message": "No audio received"})
                     continue
 
                 audio_bytes = bytes(audio_buffer)
                 audio_buffer.clear()
 
                 # 1. Speech-to-text
-                if _whisper_available:
-                    transcript = await _transcribe_local(audio_bytes)
+                if stt_service.local_engine_available:
+                    transcript = await stt_service.transcribe_bytes(audio_bytes, sample_rate=16000)
                 elif groq_key:
                     transcript = await _transcribe_groq(audio_bytes, groq_key)
                 else:
-                    await websocket.send_json({"type": "error", "message": "No STT engine available"})
+                    await _send_json(websocket, {"type": "error", "message": "No STT engine available"})
                     continue
 
                 if not transcript:
-                    await websocket.send_json({"type": "transcript", "text": ""})
+                    await _send_json(websocket, {"type": "transcript", "text": ""})
                     continue
 
-                await websocket.send_json({"type": "transcript", "text": transcript})
+                await _send_json(websocket, {"type": "transcript", "text": transcript})
 
                 # 2. RAG pipeline
                 from app.services.rag_service import process_query
@@ -228,7 +206,7 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
                         response_text = "I encountered an error."
                         sources = []
 
-                await websocket.send_json({"type": "response", "text": response_text, "sources": sources})
+                await _send_json(websocket, {"type": "response", "text": response_text, "sources": sources})
 
                 # 2b. TTS audio
                 try:
@@ -243,36 +221,17 @@ async def voice_websocket(websocket: WebSocket, agent_id: str):
 
                     audio_data_uri = result.get("audioUrl") if isinstance(result, dict) else None
                     if audio_data_uri:
-                        await websocket.send_json({"type": "audio", "data": audio_data_uri})
+                        await _send_json(websocket, {"type": "audio", "data": audio_data_uri})
                     else:
                         raise RuntimeError("No audio generated")
                 except Exception:
                     logger.warning("TTS failed in WebSocket, client will use browser speech")
 
-                # 3. Persist call log
-                async with AsyncSessionLocal() as db:
-                    try:
-                        now = datetime.now(timezone.utc)
-                        log = CallLog(
-                            tenantId=tenant_id,
-                            agentId=agent_id,
-                            startedAt=now,
-                            endedAt=now,
-                            durationSeconds=0,
-                            transcript=json.dumps(
-                                [
-                                    {"role": "user", "content": transcript},
-                                    {"role": "assistant", "content": response_text},
-                                ]
-                            ),
-                        )
-                        db.add(log)
-                        await db.commit()
-                    except Exception:
-                        logger.exception("Failed to log WebSocket voice interaction")
+                # 3. Persist call log (batched in the background)
+                log_interaction(tenant_id, agent_id, transcript, response_text)
 
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await _send_json(websocket, {"type": "pong"})
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket voice session ended: {session_id}")
@@ -10,13 +10,14 @@ Conversation history is stored in Redis under key:
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
 import logging
 from datetime import datetime, timezone
+from urllib.parse import parse_qsl
 
-import httpx
 import redis.asyncio as aioredis
 from fastapi import APIRouter, Request
 from fastapi.responses import Response
@@ -26,6 +27,7 @@ from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models import Agent, Tenant
 from app.services.credentials import decrypt_safe
+from app.services.twilio_rest import get_twilio_http_client, twilio_post
 
 logger = logging.getLogger("voiceflow.whatsapp")
 router = APIRouter()
@@ -88,16 +90,11 @@ async def _send_whatsapp_reply(
     twilio_token: str,
 ) -> None:
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
-                f"https://api.twilio.com/2010-04-01/Accounts/{twilio_sid}/Messages.json",
-                auth=(twilio_sid, twilio_token),
-                data={
-                    "To": to,
-                    "From": from_number,
-                    "Body": body,
-                },
-            )
+        resp = await twilio_post(twilio_sid, twilio_token, "Messages.json", {
+            "To": to,
+            "From": from_number,
+            "Body": body,
+        })
         if resp.status_code not in (200, 201):
             logger.warning("[whatsapp] reply failed status=%s", resp.status_code)
     except Exception:
@@ -128,7 +125,9 @@ async def handle_whatsapp(agent_id: str, request: Request):
       - Text messages: run through RAG, reply as text
       - Voice notes (audio/ogg, audio/mpeg, etc.): download → STT → RAG → text reply
     """
-    form = await request.form()
+    # Twilio posts application/x-www-form-urlencoded (media arrives by URL),
+    # so parse the body directly instead of via Starlette's form parser.
+    form = dict(parse_qsl((await request.body()).decode(), keep_blank_values=True))
     from_number: str = form.get("From", "")
     to_number: str = form.get("To", "")
     body_text: str = form.get("Body", "").strip()
@@ -150,8 +149,13 @@ async def handle_whatsapp(agent_id: str, request: Request):
     # Use sender phone as session identifier
     session_id = from_number.replace("whatsapp:", "").replace("+", "").replace("-", "")
 
-    # Resolve Twilio credentials for sending replies
-    twilio_sid, twilio_token = await _resolve_twilio_creds(tenant_id)
+    # Resolve Twilio credentials (for the media download and the reply) and
+    # load the conversation history concurrently — both are independent
+    # round-trips (Postgres and Redis).
+    (twilio_sid, twilio_token), history = await asyncio.gather(
+        _resolve_twilio_creds(tenant_id),
+        _load_history(tenant_id, agent_id, session_id),
+    )
 
     user_query: str = ""
 
@@ -177,8 +181,6 @@ async def handle_whatsapp(agent_id: str, request: Request):
         return Response(status_code=204)
 
     # ── RAG pipeline ──────────────────────────────────────────────────────────
-    history = await _load_history(tenant_id, agent_id, session_id)
-
     from app.services.rag_service import process_query
 
     try:
@@ -252,11 +254,11 @@ async def _transcribe_voice_note(
         "",
     ))
 
-    # Download the media
+    # Download the media over the pooled Twilio client — the reply goes out
+    # on the same connection pool right after.
     try:
         auth = (twilio_sid, twilio_token) if twilio_sid and twilio_token else None
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(safe_url, auth=auth)
+        resp = await get_twilio_http_client().get(safe_url, auth=auth, timeout=30)
         if resp.status_code != 200:
             logger.warning("[whatsapp] media download failed status=%s", resp.status_code)
             return ""
@@ -22,6 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import Agent, AgentConfiguration, CallLog
+from app.responses import OrjsonResponse
 from app.services.rag_service import (
     process_query,
     get_conversation_history,
@@ -184,11 +185,11 @@ async def send_message(
     # Full RAG pipeline
     rag_result = await process_query(db, agent.tenantId, agent_id, message, session_id)
 
-    return {
+    return OrjsonResponse({
         "response": rag_result.get("response", ""),
         "sessionId": session_id,
         "sources": rag_result.get("sources", []),
-    }
+    })
 
 
 @router.get("/{agent_id}/sessions/{session_id}")
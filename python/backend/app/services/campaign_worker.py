@@ -17,11 +17,11 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
 import redis.asyncio as aioredis
 
 from app.config import settings
 from app.services.compliance_service import compliance_service
+from app.services.twilio_rest import twilio_post
 
 logger = logging.getLogger("voiceflow.campaign_worker")
 
@@ -119,6 +119,9 @@ class CampaignWorker:
                 campaign.startedAt = datetime.now(timezone.utc)
                 await db.commit()
 
+            # Resolve Twilio creds once per run rather than once per dial
+            twilio_creds = await self._resolve_twilio_creds(campaign.tenantId)
+
             # Main dial loop
             while True:
                 contact_id = await redis.lpop(queue_key)
@@ -173,6 +176,7 @@ class CampaignWorker:
                         campaign=campaign,
                         agent=agent,
                         contact=contact,
+                        creds=twilio_creds,
                         db=db,
                     )
                     if call_sid:
@@ -326,10 +330,11 @@ class CampaignWorker:
         campaign,
         agent,
         contact,
+        creds: tuple[str | None, str | None],
         db,
     ) -> str | None:
         """Use Twilio REST API to place an outbound call.  Returns call_sid or None."""
-        sid, token = await self._resolve_twilio_creds(campaign.tenantId)
+        sid, token = creds
         if not sid or not token:
             logger.warning(
                 "[campaign_worker] no Twilio creds for tenant=%s", campaign.tenantId
@@ -348,20 +353,15 @@ class CampaignWorker:
         amd_callback_url = f"{base_url}/api/campaigns/{campaign.id}/amd-callback"
 
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                resp = await client.post(
-                    f"https://api.twilio.com/2010-04-01/Accounts/{sid}/Calls.json",
-                    auth=(sid, token),
-                    data={
-                        "To": contact.phoneNumber,
-                        "From": agent.phoneNumber or "",
-                        "Url": twiml_url,
-                        "MachineDetection": "Enable",
-                        "AsyncAmd": "true",
-                        "AsyncAmdStatusCallback": amd_callback_url,
-                        "StatusCallback": f"{base_url}/api/voice/status/{agent.id}",
-                    },
-                )
+            resp = await twilio_post(sid, token, "Calls.json", {
+                "To": contact.phoneNumber,
+                "From": agent.phoneNumber or "",
+                "Url": twiml_url,
+                "MachineDetection": "Enable",
+                "AsyncAmd": "true",
+                "AsyncAmdStatusCallback": amd_callback_url,
+                "StatusCallback": f"{base_url}/api/voice/status/{agent.id}",
+            })
             if resp.status_code in (200, 201):
                 call_sid = resp.json().get("sid")
                 logger.info(
@@ -394,12 +394,7 @@ class CampaignWorker:
 <Response><Say>{message}</Say><Hangup/></Response>"""
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                await client.post(
-                    f"https://api.twilio.com/2010-04-01/Accounts/{sid}/Calls/{call_sid}.json",
-                    auth=(sid, token),
-                    data={"Twiml": twiml},
-                )
+            await twilio_post(sid, token, f"Calls/{call_sid}.json", {"Twiml": twiml})
         except Exception:
             logger.exception("[campaign_worker] voicemail error call=%s", call_sid)
 
@@ -409,12 +404,7 @@ class CampaignWorker:
         if not sid or not token:
             return
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                await client.post(
-                    f"https://api.twilio.com/2010-04-01/Accounts/{sid}/Calls/{call_sid}.json",
-                    auth=(sid, token),
-                    data={"Status": "completed"},
-                )
+            await twilio_post(sid, token, f"Calls/{call_sid}.json", {"Status": "completed"})
         except Exception:
             logger.exception("[campaign_worker] hangup error call=%s", call_sid)
 
@@ -6,6 +6,9 @@ Uses a 32-byte key from CREDENTIALS_ENCRYPTION_KEY env var.
 import os
 import base64
 import logging
+import threading
+import time
+from collections import OrderedDict
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
@@ -15,6 +18,13 @@ logger = logging.getLogger("voiceflow.credentials")
 
 _KEY_BYTES: bytes | None = None
 
+# Short-lived ciphertext → plaintext cache: tenant keys are decrypted on every
+# query/call, but plaintext secrets shouldn't outlive a rotation in memory.
+_DECRYPT_CACHE_TTL = 300.0
+_DECRYPT_CACHE_SIZE = 256
+_decrypt_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_decrypt_cache_lock = threading.Lock()
+
 
 def _get_key() -> bytes:
     """Derive 32-byte AES key from hex env var, or generate a deterministic demo key."""
@@ -45,15 +55,39 @@ def encrypt(plaintext: str) -> str:
 
 
 def decrypt(token: str) -> str:
-    """Decrypt a base64-encoded 'nonce+ciphertext' back to plaintext."""
+    """
+    Decrypt a base64-encoded 'nonce+ciphertext' back to plaintext.
+    Results are cached per token for _DECRYPT_CACHE_TTL seconds (failures are
+    not cached); clear_decrypt_cache() drops them when credentials change.
+    """
     if not token:
         return ""
+    now = time.monotonic()
+    with _decrypt_cache_lock:
+        cached = _decrypt_cache.get(token)
+        if cached and cached[0] > now:
+            _decrypt_cache.move_to_end(token)
+            return cached[1]
+
     key = _get_key()
     aesgcm = AESGCM(key)
     combined = base64.urlsafe_b64decode(token)
     nonce = combined[:12]
     ct = combined[12:]
-    return aesgcm.decrypt(nonce, ct, None).decode("utf-8")
+    plaintext = aesgcm.decrypt(nonce, ct, None).decode("utf-8")
+
+    with _decrypt_cache_lock:
+        _decrypt_cache[token] = (now + _DECRYPT_CACHE_TTL, plaintext)
+        _decrypt_cache.move_to_end(token)
+        while len(_decrypt_cache) > _DECRYPT_CACHE_SIZE:
+            _decrypt_cache.popitem(last=False)
+    return plaintext
+
+
+def clear_decrypt_cache() -> None:
+    """Forget all cached plaintexts (call after tenant credentials are updated or removed)."""
+    with _decrypt_cache_lock:
+        _decrypt_cache.clear()
 
 
 def encrypt_if_needed(value: str) -> str:
@@ -33,11 +33,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
 from typing import Any
 
 logger = logging.getLogger("voiceflow.flow_engine")
 
 _MAX_HOPS = 50  # guard against infinite loops in malformed flows
+_PLACEHOLDER_RE = re.compile(r"\{\{([^}]+)\}\}")
 
 
 class FlowEngine:
@@ -191,11 +193,10 @@ class FlowEngine:
 
     def _interpolate(self, text: str, context: dict) -> str:
         """Replace {{key}} placeholders with context values."""
-        import re
         def replace(m):
             key = m.group(1).strip()
             return str(context.get(key, m.group(0)))
-        return re.sub(r"\{\{([^}]+)\}\}", replace, text)
+        return _PLACEHOLDER_RE.sub(replace, text)
 
     async def _query_rag(self, node: dict, context: dict, user_input: str) -> str:
         """Call the RAG pipeline for a knowledge node."""
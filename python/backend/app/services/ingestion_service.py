@@ -16,16 +16,24 @@ import mimetypes
 import os
 import re
 import tempfile
+import threading
 import uuid
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-import chromadb
+import orjson
 import redis
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
+
+# chromadb and sentence-transformers (torch) are imported on first use, so
+# importing this module (route registration, scheduler) stays cheap.
+if TYPE_CHECKING:
+    import chromadb
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger("voiceflow.ingestion")
 
@@ -33,14 +41,54 @@ logger = logging.getLogger("voiceflow.ingestion")
 _thread_pool = ThreadPoolExecutor(max_workers=4)
 
 # ── Lazy-loaded heavy models ─────────────────────────────────────────────────
-_embedding_model: Optional[SentenceTransformer] = None
+_embedding_model: Optional["SentenceTransformer"] = None
+_embedding_model_lock = threading.Lock()
 _docling_converter = None
 _paddle_ocr = None
-_chroma_client: Optional[chromadb.HttpClient] = None
+_chroma_client: Optional["chromadb.HttpClient"] = None
 _redis_client: Optional[redis.Redis] = None
 
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+SOURCE_PREVIEW_CHARS = 200
+
+# URL ingestion pipeline: concurrent scrapers feed a single store worker
+# through a bounded queue (backpressure when embedding falls behind).
+# SCRAPE_CONCURRENCY also bounds in-flight fetches in the website crawler.
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "6"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+INGEST_EMBED_BATCH = int(os.getenv("INGEST_EMBED_BATCH", "64"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "0.5"))
+# Max ids per Chroma upsert; independent of the embedding batch size.
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "1000"))
+
+# HNSW index parameters — search_ef trades recall for query latency,
+# M / construction_ef control graph density (fixed at collection creation).
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": int(os.getenv("HNSW_M", "16")),
+    "hnsw:construction_ef": int(os.getenv("HNSW_EF_CONS", "100")),
+    "hnsw:search_ef": int(os.getenv("HNSW_EF_SEARCH", "64")),
+}
+_tuned_collections: set[str] = set()
+
+# bm25 key → fingerprint of the corpus last written, so a rebuild that finds
+# the same chunks (e.g. a crawl batch that added nothing) only refreshes the TTL.
+_bm25_fingerprints: dict[str, int] = {}
+
+# Text → embedding LRU for query-side lookups; repeated queries skip encode.
+# Bulk document encodes bypass it so an upload doesn't evict the hot queries.
+# Cached vectors are read-only since every hit shares the same array.
+# Sharded by hash(text) so an ingestion batch updating the cache doesn't hold
+# up query lookups running in other executor threads.
+EMBED_BATCH_SIZE = 64
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+EMBED_CACHE_SHARDS = 16
+_EMBED_SHARD_SIZE = max(1, EMBED_CACHE_SIZE // EMBED_CACHE_SHARDS)
+_embed_cache_shards: "list[OrderedDict[str, np.ndarray]]" = [
+    OrderedDict() for _ in range(EMBED_CACHE_SHARDS)
+]
+_embed_cache_locks = [threading.Lock() for _ in range(EMBED_CACHE_SHARDS)]
 
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=CHUNK_SIZE,
@@ -49,15 +97,40 @@ text_splitter = RecursiveCharacterTextSplitter(
 )
 
 
-def _get_embedding_model() -> SentenceTransformer:
+def _get_embedding_model() -> "SentenceTransformer":
     global _embedding_model
     if _embedding_model is None:
-        model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
-        _embedding_model = SentenceTransformer(model_name)
-        logger.info(f"[ingestion] Loaded embedding model: {model_name}")
+        # Locked so concurrent executor threads don't each load the model.
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+
+                model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+                model = SentenceTransformer(model_name)
+                if os.getenv("EMBED_QUANTIZE", "").lower() == "int8":
+                    model = _quantize_int8(model)
+                _embedding_model = model
+                logger.info(f"[ingestion] Loaded embedding model: {model_name}")
     return _embedding_model
 
 
+def _quantize_int8(model: "SentenceTransformer") -> "SentenceTransformer":
+    """
+    Apply dynamic int8 quantization to the embedder's Linear layers (CPU only).
+    MiniLM-class models keep near-identical retrieval quality with ~4x smaller
+    weights and faster int8 matmuls. Falls back to the fp32 model on failure.
+    """
+    try:
+        import torch
+
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info("[ingestion] Embedding model quantized to int8")
+        return quantized
+    except Exception as e:
+        logger.warning(f"[ingestion] int8 quantization failed, using fp32 model: {e}")
+        return model
+
+
 def _get_docling_converter():
     """Lazy-load Docling DocumentConverter."""
     global _docling_converter
@@ -85,10 +158,12 @@ def _get_paddle_ocr():
     return _paddle_ocr
 
 
-def _get_chroma() -> Optional[chromadb.HttpClient]:
+def _get_chroma() -> Optional["chromadb.HttpClient"]:
     global _chroma_client
     if _chroma_client is None:
         try:
+            import chromadb
+
             host = os.getenv("CHROMA_HOST", "localhost")
             port = int(os.getenv("CHROMA_PORT", "8030"))
             _chroma_client = chromadb.HttpClient(host=host, port=port)
@@ -100,6 +175,25 @@ def _get_chroma() -> Optional[chromadb.HttpClient]:
     return _chroma_client
 
 
+def _get_tenant_collection(client, tenant_id: str):
+    """
+    Get or create the tenant collection with the configured HNSW parameters.
+    Existing collections get their search_ef updated once per process, which
+    takes effect without a reindex.
+    """
+    collection_name = f"tenant_{tenant_id}"
+    collection = client.get_or_create_collection(name=collection_name, metadata=HNSW_METADATA)
+    if collection_name not in _tuned_collections:
+        _tuned_collections.add(collection_name)
+        search_ef = HNSW_METADATA["hnsw:search_ef"]
+        if (collection.metadata or {}).get("hnsw:search_ef") != search_ef:
+            try:
+                collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+            except Exception as e:
+                logger.warning(f"[ingestion] Could not update search_ef on {collection_name}: {e}")
+    return collection
+
+
 def _get_redis() -> Optional[redis.Redis]:
     global _redis_client
     if _redis_client is None:
@@ -253,31 +347,38 @@ def _fallback_extract(file_path: str) -> str:
 # 2. URL SCRAPING
 # ══════════════════════════════════════════════════════════════════════════════
 
+def _extract_html_text(html: str) -> str:
+    """Extract main text from HTML with trafilatura, falling back to BeautifulSoup."""
+    import trafilatura
+
+    # Extract with trafilatura
+    text = trafilatura.extract(html, include_comments=False, include_tables=True)
+    if text and len(text.strip()) > 100:
+        return text.strip()
+
+    # Fallback: BeautifulSoup basic extraction
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "footer", "header"]):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return text.strip()
+
+
 async def scrape_url(url: str) -> str:
     """Scrape text content from a URL using trafilatura with httpx fallback."""
     import httpx
 
     try:
-        import trafilatura
-
         # Download page
         async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
             resp = await client.get(url, headers={"User-Agent": "Mozilla/5.0 VoiceFlow Ingestion Bot"})
             resp.raise_for_status()
             html = resp.text
 
-        # Extract with trafilatura
-        text = trafilatura.extract(html, include_comments=False, include_tables=True)
-        if text and len(text.strip()) > 100:
-            return text.strip()
-
-        # Fallback: BeautifulSoup basic extraction
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer", "header"]):
-            tag.decompose()
-        text = soup.get_text(separator="\n", strip=True)
-        return text.strip()
+        # HTML parsing is CPU-bound — keep it off the event loop
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(_thread_pool, _extract_html_text, html)
 
     except Exception as e:
         logger.warning(f"URL scraping failed for {url}: {e}")
@@ -286,9 +387,10 @@ async def scrape_url(url: str) -> str:
 
 async def scrape_company_website(base_url: str, max_pages: int = 20) -> list[dict]:
     """Crawl a company website and return list of {url, content} dicts."""
-    import httpx
     from urllib.parse import urljoin, urlparse
 
+    import httpx
+
     visited = set()
     results = []
     to_visit = [base_url]
@@ -342,17 +444,22 @@ async def scrape_company_website(base_url: str, max_pages: int = 20) -> list[dic
 # 3. POST-PROCESSING — Clean + Chunk
 # ══════════════════════════════════════════════════════════════════════════════
 
+_HSPACE_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_PAGE_FOOTER_RE = re.compile(r"Page \d+ of \d+")
+
+
 def clean_text(text: str) -> str:
     """Clean extracted text: normalize whitespace, remove artifacts."""
     if not text:
         return ""
     # Normalize whitespace
-    text = re.sub(r"\r\n", "\n", text)
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = text.replace("\r\n", "\n")
+    text = _HSPACE_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     # Remove common artifacts
-    text = re.sub(r"Page \d+ of \d+", "", text)
-    text = re.sub(r"\x0c", "\n", text)  # Form feeds
+    text = _PAGE_FOOTER_RE.sub("", text)
+    text = text.replace("\x0c", "\n")  # Form feeds
     return text.strip()
 
 
@@ -362,30 +469,86 @@ def chunk_text(text: str, source: str = "", metadata: dict = None) -> list[dict]
         return []
 
     chunks = text_splitter.split_text(text)
-    result = []
-    for i, chunk in enumerate(chunks):
-        chunk_meta = {
-            "source": source,
-            "chunk_index": i,
-            "total_chunks": len(chunks),
-            **(metadata or {}),
-        }
-        result.append({
+    # Fields shared by every chunk are merged once, not per chunk
+    shared_meta = {"total_chunks": len(chunks), **(metadata or {})}
+    return [
+        {
             "content": chunk,
-            "metadata": chunk_meta,
-        })
-    return result
+            "metadata": {"source": source, "chunk_index": i, **shared_meta},
+        }
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def _clean_and_chunk(text: str, source: str, metadata: dict) -> list[dict]:
+    """clean_text + chunk_text in one call, for running in the thread pool."""
+    return chunk_text(clean_text(text), source=source, metadata=metadata)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 4. EMBEDDING + STORAGE — ChromaDB + BM25 Index
 # ══════════════════════════════════════════════════════════════════════════════
 
-def embed_texts(texts: list[str]) -> list[list[float]]:
-    """Generate embeddings for a list of texts."""
-    model = _get_embedding_model()
-    embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
-    return embeddings.tolist()
+def embed_texts(texts: list[str], use_cache: bool = True) -> "list[np.ndarray]":
+    """
+    Generate embeddings for a list of texts, as float32 vectors.
+    Cached texts are served from the LRU; all misses go through a single
+    batched ``encode`` call instead of one call per text. Pass
+    ``use_cache=False`` for bulk document encodes.
+    """
+    results: "list[Optional[np.ndarray]]" = [None] * len(texts)
+    misses: dict[str, list[int]] = {}
+    for i, text in enumerate(texts):
+        if not use_cache:
+            misses.setdefault(text, []).append(i)
+            continue
+        shard = hash(text) % EMBED_CACHE_SHARDS
+        cache = _embed_cache_shards[shard]
+        with _embed_cache_locks[shard]:
+            cached = cache.get(text)
+            if cached is not None:
+                cache.move_to_end(text)
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.setdefault(text, []).append(i)
+
+    if misses:
+        # encode() length-sorts inputs before batching (smart batching),
+        # so misses are passed in original order and un-permuted by the model.
+        batch = list(misses)
+        model = _get_embedding_model()
+        vectors = model.encode(
+            batch,
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        # Kept as float32 rows (Chroma's wire type, ~8x smaller than a list of
+        # Python floats). Rows are copied so an evicted cache entry doesn't
+        # keep its whole encode batch alive.
+        for text, vec in zip(batch, vectors.astype("float32", copy=False)):
+            vec = vec.copy()
+            for i in misses[text]:
+                results[i] = vec
+            if not use_cache:
+                continue
+            vec.flags.writeable = False
+            shard = hash(text) % EMBED_CACHE_SHARDS
+            cache = _embed_cache_shards[shard]
+            with _embed_cache_locks[shard]:
+                cache[text] = vec
+                cache.move_to_end(text)
+                while len(cache) > _EMBED_SHARD_SIZE:
+                    cache.popitem(last=False)
+
+    return results
+
+
+def embed_query(query: str) -> "np.ndarray":
+    """Embed a single search query with the same model used at ingestion time."""
+    return embed_texts([query])[0]
 
 
 def store_in_chromadb(
@@ -400,6 +563,8 @@ def store_in_chromadb(
     Metadata includes agentId for per-agent filtering.
     Returns number of chunks stored.
     """
+    import numpy as np
+
     client = _get_chroma()
     if not client:
         logger.error("ChromaDB not available, cannot store documents")
@@ -408,49 +573,90 @@ def store_in_chromadb(
     if not chunks:
         return 0
 
-    collection_name = f"tenant_{tenant_id}"
-    collection = client.get_or_create_collection(
-        name=collection_name,
-        metadata={"hnsw:space": "cosine"},
-    )
-
-    # Prepare data
-    texts = [c["content"] for c in chunks]
-    ids = []
-    metadatas = []
-    for i, chunk in enumerate(chunks):
-        chunk_id = hashlib.sha256(
-            f"{tenant_id}:{agent_id}:{chunk['metadata'].get('source', '')}:{i}:{chunk['content'][:100]}".encode()
-        ).hexdigest()[:24]
-        ids.append(chunk_id)
-        meta = {
-            "agentId": agent_id,
-            "source_type": source_type,
-            **{k: str(v) if not isinstance(v, (str, int, float, bool)) else v
-               for k, v in chunk["metadata"].items()},
-        }
-        metadatas.append(meta)
+    collection = _get_tenant_collection(client, tenant_id)
 
-    # Generate embeddings
-    embeddings = embed_texts(texts)
+    id_prefix = f"{tenant_id}:{agent_id}:"
+    base_meta = {"agentId": agent_id, "source_type": source_type}
 
-    # Upsert in batches of 100
-    batch_size = 100
+    # Embed + upsert one UPSERT_BATCH_SIZE slice at a time, so only a single
+    # slice's ids / metadata / embedding vectors are alive at once however
+    # large the document is. Each upsert is one index write.
     stored = 0
-    for start in range(0, len(ids), batch_size):
-        end = start + batch_size
+    for start in range(0, len(chunks), UPSERT_BATCH_SIZE):
+        batch = chunks[start:start + UPSERT_BATCH_SIZE]
+        texts = [c["content"] for c in batch]
+        ids = []
+        metadatas = []
+        for i, chunk in enumerate(batch, start):
+            # Key on the chunk's index within its source (not its position in this
+            # call) so ids stay stable when several sources are stored together.
+            index = chunk["metadata"].get("chunk_index", i)
+            chunk_id = hashlib.sha256(
+                f"{id_prefix}{chunk['metadata'].get('source', '')}:{index}:{chunk['content'][:100]}".encode()
+            ).hexdigest()[:24]
+            ids.append(chunk_id)
+            meta = {
+                **base_meta,
+                # Snippet shown in query sources, precomputed once at ingest
+                "preview": chunk["content"][:SOURCE_PREVIEW_CHARS],
+                **{k: str(v) if not isinstance(v, (str, int, float, bool)) else v
+                   for k, v in chunk["metadata"].items()},
+            }
+            metadatas.append(meta)
+
         collection.upsert(
-            ids=ids[start:end],
-            documents=texts[start:end],
-            embeddings=embeddings[start:end],
-            metadatas=metadatas[start:end],
+            ids=ids,
+            documents=texts,
+            embeddings=np.stack(embed_texts(texts, use_cache=False)),
+            metadatas=metadatas,
         )
-        stored += len(ids[start:end])
+        stored += len(ids)
 
-    logger.info(f"[ingestion] Stored {stored} chunks in {collection_name} for agent {agent_id}")
+    _invalidate_query_index(tenant_id, agent_id)
+    logger.info(f"[ingestion] Stored {stored} chunks in {collection.name} for agent {agent_id}")
     return stored
 
 
+def _invalidate_query_index(tenant_id: str, agent_id: str) -> None:
+    """Drop the query side's in-memory index for an agent whose chunks changed."""
+    try:
+        from app.services.rag_service import invalidate_inmem_index
+    except ImportError:
+        return
+    invalidate_inmem_index(tenant_id, agent_id)
+
+
+def delete_source_chunks(tenant_id: str, agent_id: str, source: str) -> int:
+    """
+    Delete an agent's stored chunks for one source, so re-ingesting it replaces
+    the old chunks instead of adding new ids next to them (chunk ids hash the
+    content and, for older ingests, the position within a store batch).
+    """
+    client = _get_chroma()
+    if not client:
+        return 0
+
+    try:
+        collection = client.get_collection(f"tenant_{tenant_id}")
+    except Exception:
+        return 0  # nothing stored for this tenant yet
+
+    try:
+        results = collection.get(
+            where={"$and": [{"agentId": agent_id}, {"source": source}]},
+            include=[],
+        )
+        ids = results.get("ids", [])
+        if ids:
+            collection.delete(ids=ids)
+            _invalidate_query_index(tenant_id, agent_id)
+            logger.info(f"[ingestion] Replaced {len(ids)} existing chunks of {source} for agent {agent_id}")
+        return len(ids)
+    except Exception as e:
+        logger.warning(f"[ingestion] Failed to delete existing chunks of {source}: {e}")
+        return 0
+
+
 def build_bm25_index(tenant_id: str, agent_id: str) -> None:
     """
     Build a BM25 index from all documents in a tenant+agent collection.
@@ -482,9 +688,21 @@ def build_bm25_index(tenant_id: str, agent_id: str) -> None:
 
     documents = results.get("documents", [])
     ids = results.get("ids", [])
+    metadatas = results.get("metadatas", [])
     if not documents:
         return
 
+    key = f"bm25:{tenant_id}:{agent_id}"
+    # Metadata is stored with the corpus (sources, policy tags), so it counts too
+    fingerprint = hash((
+        tuple(ids),
+        tuple(documents),
+        orjson.dumps(metadatas, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+    ))
+    if _bm25_fingerprints.get(key) == fingerprint and r.expire(key, 86400):
+        logger.info(f"[bm25] Index for {tenant_id}/{agent_id} unchanged ({len(documents)} docs)")
+        return
+
     # Tokenize for BM25
     tokenized = [doc.lower().split() for doc in documents]
 
@@ -492,11 +710,12 @@ def build_bm25_index(tenant_id: str, agent_id: str) -> None:
     bm25_data = {
         "ids": ids,
         "documents": documents,
-        "metadatas": results.get("metadatas", []),
+        "metadatas": metadatas,
         "tokenized": tokenized,
     }
-    key = f"bm25:{tenant_id}:{agent_id}"
-    r.set(key, json.dumps(bm25_data), ex=86400)  # 24h TTL
+    # orjson: the corpus is the largest blob in Redis, re-read on every query
+    r.set(key, orjson.dumps(bm25_data), ex=86400)  # 24h TTL
+    _bm25_fingerprints[key] = fingerprint
     logger.info(f"[bm25] Built index for {tenant_id}/{agent_id}: {len(documents)} docs")
 
 
@@ -545,11 +764,17 @@ async def ingest_file(
         if job_id:
             _update_job_status(job_id, "processing", 40)
 
-        text = clean_text(text)
-        chunks = chunk_text(text, source=filename, metadata={
-            "filename": filename,
-            "content_type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
-        })
+        chunks = await loop.run_in_executor(
+            _thread_pool, _clean_and_chunk, text, filename, {
+                "filename": filename,
+                "content_type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            },
+        )
+
+        # Drop chunks from a previous upload of the same file first
+        await loop.run_in_executor(
+            _thread_pool, delete_source_chunks, tenant_id, agent_id, filename,
+        )
 
         # Store chunks incrementally in batches of 20
         total_stored = 0
@@ -597,53 +822,131 @@ async def ingest_urls(
     job_id: str = None,
 ) -> dict:
     """
-    Ingest content from URLs:
-    1. Scrape each URL
-    2. Clean + chunk
-    3. Embed + store in ChromaDB
-    4. Build BM25 index
+    Ingest content from URLs as a two-stage pipeline:
+    1. Scrape workers (SCRAPE_CONCURRENCY) fetch, clean + chunk pages
+    2. A store worker embeds + stores chunks in ChromaDB, micro-batched
+       across pages (INGEST_EMBED_BATCH chunks / INGEST_FLUSH_INTERVAL)
+    3. Build BM25 index
+    The queue between the stages is bounded, so scraping runs ahead of
+    embedding by at most INGEST_QUEUE_SIZE pages.
     """
     if job_id:
         _update_job_status(job_id, "processing", 10)
 
+    loop = asyncio.get_event_loop()
+    url_q: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        url_q.put_nowait(url)
+    chunk_q: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+
     total_chunks = 0
     processed = 0
+    finished = 0
     errors = []
 
-    for i, url in enumerate(urls):
-        try:
-            text = await scrape_url(url)
-            if not text or len(text.strip()) < 50:
-                errors.append(f"{url}: no content extracted")
-                continue
+    def _advance() -> None:
+        nonlocal finished
+        finished += 1
+        if job_id:
+            progress = 10 + int(80 * finished / len(urls))
+            _update_job_status(job_id, "processing", progress)
 
-            text = clean_text(text)
-            chunks = chunk_text(text, source=url, metadata={"url": url})
+    async def scrape_worker() -> None:
+        while True:
+            try:
+                url = url_q.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                text = await scrape_url(url)
+                if not text or len(text.strip()) < 50:
+                    errors.append(f"{url}: no content extracted")
+                    _advance()
+                    continue
+                chunks = await loop.run_in_executor(
+                    _thread_pool, _clean_and_chunk, text, url, {"url": url},
+                )
+            except Exception as e:
+                errors.append(f"{url}: {str(e)}")
+                _advance()
+                continue
+            await chunk_q.put((url, chunks))
 
-            loop = asyncio.get_event_loop()
+    async def flush(batch: list[tuple[str, list[dict]]]) -> None:
+        nonlocal total_chunks, processed
+        chunks = [c for _, batch_chunks in batch for c in batch_chunks]
+        try:
             stored = await loop.run_in_executor(
                 _thread_pool,
                 store_in_chromadb,
                 tenant_id, agent_id, chunks, "url_scrape",
             )
             total_chunks += stored
-            processed += 1
+            before = processed
+            processed += len(batch)
 
             # Rebuild BM25 every 3 URLs so search works incrementally
-            if processed % 3 == 0:
+            if processed // 3 > before // 3:
                 await loop.run_in_executor(
                     _thread_pool, build_bm25_index, tenant_id, agent_id,
                 )
-
+            for _ in batch:
+                _advance()
         except Exception as e:
-            errors.append(f"{url}: {str(e)}")
-
+            errors.extend(f"{url}: {str(e)}" for url, _ in batch)
+
+    async def store_worker() -> None:
+        # Micro-batch pages so one embed + upsert call covers several URLs:
+        # flush at INGEST_EMBED_BATCH chunks or INGEST_FLUSH_INTERVAL seconds
+        # after the first page of the batch arrived, whichever comes first.
+        batch: list[tuple[str, list[dict]]] = []
+        pending = 0
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - loop.time(), 0) if batch else None
+            try:
+                item = await asyncio.wait_for(chunk_q.get(), timeout)
+            except asyncio.TimeoutError:
+                item = False
+            if item:
+                if not batch:
+                    deadline = loop.time() + INGEST_FLUSH_INTERVAL
+                batch.append(item)
+                pending += len(item[1])
+                if pending < INGEST_EMBED_BATCH:
+                    continue
+            if batch:
+                await flush(batch)
+                batch, pending = [], 0
+            if item is None:
+                return
+
+    # If the store worker dies nothing drains chunk_q, so the scrapers are
+    # cancelled instead of blocking on put() forever, and the job fails.
+    store_task = asyncio.create_task(store_worker())
+    scrapers = asyncio.gather(*(
+        scrape_worker() for _ in range(min(SCRAPE_CONCURRENCY, len(urls)))
+    ))
+    store_task.add_done_callback(lambda _: scrapers.cancel())
+    try:
+        try:
+            await scrapers
+        except asyncio.CancelledError:
+            if not store_task.done():
+                raise
+        finally:
+            if not store_task.done():
+                sentinel = asyncio.ensure_future(chunk_q.put(None))
+                await asyncio.wait({sentinel, store_task}, return_when=asyncio.FIRST_COMPLETED)
+                sentinel.cancel()
+        await store_task
+    except Exception as e:
+        logger.exception(f"[ingestion] URL ingestion store worker failed for agent {agent_id}")
         if job_id:
-            progress = 10 + int(80 * (i + 1) / len(urls))
-            _update_job_status(job_id, "processing", progress)
+            _update_job_status(job_id, "failed", 0, str(e))
+        raise
 
     # Final BM25 rebuild
-    loop = asyncio.get_event_loop()
     await loop.run_in_executor(
         _thread_pool,
         build_bm25_index,
@@ -661,6 +964,45 @@ async def ingest_urls(
     }
 
 
+def _process_crawled_page(
+    html: str, url: str, base_domain: str,
+) -> tuple[Optional[list[dict]], list[str]]:
+    """
+    Extract, clean + chunk one crawled page and collect same-domain links.
+    Returns (chunks, links); chunks is None when the page had no usable text.
+    Runs in the thread pool — trafilatura / BeautifulSoup are CPU-bound.
+    """
+    from urllib.parse import urljoin, urlparse
+
+    import trafilatura
+    from bs4 import BeautifulSoup
+
+    text = trafilatura.extract(html, include_comments=False, include_tables=True) or ""
+
+    # BeautifulSoup fallback for JS-heavy pages
+    if not text or len(text.strip()) < 50:
+        soup = BeautifulSoup(html, "html.parser")
+        for tag in soup(["script", "style", "nav", "footer", "header", "noscript"]):
+            tag.decompose()
+        text = soup.get_text(separator="\n", strip=True)
+
+    chunks = None
+    if text and len(text.strip()) > 50:
+        chunks = _clean_and_chunk(text, url, {"url": url})
+
+    # Discover links on same domain
+    links = []
+    soup = BeautifulSoup(html, "html.parser")
+    for a in soup.find_all("a", href=True):
+        link = urljoin(url, a["href"])
+        parsed = urlparse(link)
+        if parsed.netloc == base_domain:
+            path = parsed.path.lower()
+            if not any(path.endswith(ext) for ext in (".pdf", ".jpg", ".png", ".zip", ".mp4", ".mp3")):
+                links.append(link.split("#")[0].split("?")[0])
+    return chunks, links
+
+
 async def ingest_company_website(
     website_url: str,
     tenant_id: str,
@@ -670,12 +1012,13 @@ async def ingest_company_website(
 ) -> dict:
     """
     Crawl a company website and ingest pages incrementally.
-    Each page is stored in ChromaDB as soon as it's scraped — no waiting.
+    Pages are stored in ChromaDB in batches of ~INGEST_EMBED_BATCH chunks,
+    so one embed + upsert call covers several small pages.
     BM25 index is rebuilt after every 5 pages for near-realtime search.
     """
+    from urllib.parse import urlparse
+
     import httpx
-    from urllib.parse import urljoin, urlparse
-    from bs4 import BeautifulSoup
 
     if job_id:
         _update_job_status(job_id, "processing", 5)
@@ -686,65 +1029,93 @@ async def ingest_company_website(
     total_chunks = 0
     pages_done = 0
     loop = asyncio.get_event_loop()
+    pending: list[tuple[str, list[dict]]] = []
 
-    while to_visit and len(visited) < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
-        visited.add(url)
-
+    async def flush_pending() -> None:
+        """Store the pending pages; on failure they stay pending for the next flush."""
+        nonlocal total_chunks, pending
+        chunks = [c for _, page_chunks in pending for c in page_chunks]
         try:
-            async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-                resp = await client.get(url, headers={"User-Agent": "Mozilla/5.0 VoiceFlow Bot"})
-                resp.raise_for_status()
-                html = resp.text
-
-            import trafilatura
-            text = trafilatura.extract(html, include_comments=False, include_tables=True) or ""
+            stored = await loop.run_in_executor(
+                _thread_pool,
+                store_in_chromadb,
+                tenant_id, agent_id, chunks, "company_website",
+            )
+        except Exception:
+            pages = ", ".join(page_url for page_url, _ in pending)
+            logger.exception(f"[ingestion] Failed to store {len(chunks)} chunks from {pages}")
+            return
+        batch, pending = pending, []
+        total_chunks += stored
+        for page_url, page_chunks in batch:
+            logger.info(f"[ingestion] Stored {len(page_chunks)} chunks from {page_url}")
 
-            # BeautifulSoup fallback for JS-heavy pages
-            if not text or len(text.strip()) < 50:
-                soup = BeautifulSoup(html, "html.parser")
-                for tag in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-                    tag.decompose()
-                text = soup.get_text(separator="\n", strip=True)
+    sem = asyncio.Semaphore(SCRAPE_CONCURRENCY)
 
-            if text and len(text.strip()) > 50:
-                text = clean_text(text)
-                chunks = chunk_text(text, source=url, metadata={"url": url})
-
-                if chunks:
-                    stored = await loop.run_in_executor(
-                        _thread_pool,
-                        store_in_chromadb,
-                        tenant_id, agent_id, chunks, "company_website",
-                    )
-                    total_chunks += stored
-                    logger.info(f"[ingestion] Stored {stored} chunks from {url}")
-
-                pages_done += 1
-                # Rebuild BM25 every 5 pages so search works incrementally
-                if pages_done % 5 == 0:
-                    await loop.run_in_executor(
-                        _thread_pool, build_bm25_index, tenant_id, agent_id,
+    async def fetch(client, url: str) -> Optional[str]:
+        async with sem:
+            try:
+                resp = await client.get(url)
+                resp.raise_for_status()
+                return resp.text
+            except Exception:
+                return None
+
+    async with httpx.AsyncClient(
+        timeout=20,
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0 VoiceFlow Bot"},
+    ) as client:
+        # Crawl breadth-first, fetching each wave of discovered pages concurrently
+        while to_visit and len(visited) < max_pages:
+            wave: list[str] = []
+            while to_visit and len(visited) + len(wave) < max_pages:
+                url = to_visit.pop(0)
+                if url not in visited and url not in wave:
+                    wave.append(url)
+            visited.update(wave)
+            pages = await asyncio.gather(*(fetch(client, url) for url in wave))
+
+            for url, html in zip(wave, pages):
+                if html is None:
+                    continue
+                try:
+                    chunks, links = await loop.run_in_executor(
+                        _thread_pool, _process_crawled_page, html, url, base_domain,
                     )
 
-            # Discover links on same domain
-            soup = BeautifulSoup(html, "html.parser")
-            for a in soup.find_all("a", href=True):
-                link = urljoin(url, a["href"])
-                parsed = urlparse(link)
-                if parsed.netloc == base_domain and link not in visited:
-                    path = parsed.path.lower()
-                    if not any(path.endswith(ext) for ext in (".pdf", ".jpg", ".png", ".zip", ".mp4", ".mp3")):
-                        to_visit.append(link.split("#")[0].split("?")[0])
-
-        except Exception:
-            continue
-
-        if job_id:
-            progress = 5 + int(90 * len(visited) / max(max_pages, 1))
-            _update_job_status(job_id, "processing", min(progress, 95))
+                    if chunks is not None:
+                        if chunks:
+                            pending.append((url, chunks))
+                            if sum(len(c) for _, c in pending) >= INGEST_EMBED_BATCH:
+                                await flush_pending()
+
+                        pages_done += 1
+                        # Rebuild BM25 every 5 pages so search works incrementally
+                        if pages_done % 5 == 0:
+                            if pending:
+                                await flush_pending()
+                            await loop.run_in_executor(
+                                _thread_pool, build_bm25_index, tenant_id, agent_id,
+                            )
+
+                    to_visit.extend(link for link in links if link not in visited)
+
+                except Exception:
+                    continue
+
+                if job_id:
+                    progress = 5 + int(90 * len(visited) / max(max_pages, 1))
+                    _update_job_status(job_id, "processing", min(progress, 95))
+
+    if pending:
+        await flush_pending()
+    # Anything still pending failed its last store attempt (already logged)
+    failed_chunks = sum(len(page_chunks) for _, page_chunks in pending)
+    error = None
+    if failed_chunks:
+        error = f"Failed to store {failed_chunks} chunks from {len(pending)} pages"
+        logger.error(f"[ingestion] {error} of {website_url}")
 
     # Final BM25 rebuild
     if total_chunks > 0:
@@ -753,13 +1124,14 @@ async def ingest_company_website(
         )
 
     if job_id:
-        _update_job_status(job_id, "completed", 100)
+        _update_job_status(job_id, "completed", 100, error)
 
     logger.info(f"[ingestion] Company website done: {pages_done} pages, {total_chunks} chunks from {website_url}")
     return {
         "status": "completed",
         "pages": pages_done,
         "chunks": total_chunks,
+        "failed_chunks": failed_chunks,
     }
 
 
@@ -831,6 +1203,7 @@ def delete_agent_documents(tenant_id: str, agent_id: str) -> int:
         if ids:
             collection.delete(ids=ids)
             logger.info(f"[ingestion] Deleted {len(ids)} chunks for agent {agent_id}")
+        _invalidate_query_index(tenant_id, agent_id)
 
         # Clear BM25 index
         r = _get_redis()
@@ -0,0 +1,90 @@
+"""
+Background writer for per-turn interaction logs.
+
+Chat / voice turns that only need a CallLog row written (nothing is read back)
+enqueue it here instead of committing before the response is sent. A single
+drainer task inserts queued rows in batches — one session and one commit per
+batch instead of one per turn.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.database import AsyncSessionLocal
+from app.models import CallLog
+
+logger = logging.getLogger("voiceflow.interaction_log")
+
+_QUEUE_MAXSIZE = 10_000
+_BATCH_SIZE = 128
+_STOP = object()
+
+_queue: Optional[asyncio.Queue] = None
+_drainer: Optional[asyncio.Task] = None
+
+
+def log_interaction(
+    tenant_id: str,
+    agent_id: str,
+    user_text: str,
+    assistant_text: str,
+    started_at: Optional[datetime] = None,
+) -> None:
+    """Queue a single user/assistant turn as a CallLog row (non-blocking)."""
+    global _queue, _drainer
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=_QUEUE_MAXSIZE)
+    if _drainer is None or _drainer.done():
+        _drainer = asyncio.create_task(_drain(_queue))
+
+    now = datetime.now(timezone.utc)
+    try:
+        _queue.put_nowait({
+            "tenantId": tenant_id,
+            "agentId": agent_id,
+            "callerPhone": None,
+            "startedAt": started_at or now,
+            "endedAt": now,
+            "durationSeconds": 0,
+            "transcript": json.dumps([
+                {"role": "user", "content": user_text},
+                {"role": "assistant", "content": assistant_text},
+            ]),
+        })
+    except asyncio.QueueFull:
+        logger.warning("[interaction_log] queue full — dropping log for agent=%s", agent_id)
+
+
+async def _drain(queue: asyncio.Queue) -> None:
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < _BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        rows = [row for row in batch if row is not _STOP]
+        if rows:
+            await _write(rows)
+        if len(rows) != len(batch):
+            return
+
+
+async def _write(batch: list[dict]) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            db.add_all([CallLog(**row) for row in batch])
+            await db.commit()
+    except Exception:
+        logger.exception("[interaction_log] failed to persist %d interaction logs", len(batch))
+
+
+async def flush_interaction_log() -> None:
+    """Write anything still queued and stop the drainer (called on shutdown)."""
+    global _drainer
+    if _queue is None or _drainer is None or _drainer.done():
+        return
+    await _queue.put(_STOP)
+    await _drainer
+    _drainer = None
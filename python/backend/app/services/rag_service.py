@@ -16,10 +16,15 @@ import hashlib
 import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, AsyncGenerator, Optional
 
 import httpx
+import orjson
 import redis.asyncio as aioredis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -54,6 +59,41 @@ async def get_redis() -> Optional[aioredis.Redis]:
     return _redis
 
 
+# ── Shared HTTP client for LLM calls (lazy init) ─────────────────────────────
+
+_llm_http: Optional[httpx.AsyncClient] = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Pooled client so Groq calls reuse keep-alive TLS connections."""
+    global _llm_http
+    if _llm_http is None or _llm_http.is_closed:
+        _llm_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_KEEPALIVE,
+            ),
+        )
+    return _llm_http
+
+
+async def warm_llm_http_client() -> None:
+    """Open a connection to Groq at startup so the first query skips the TLS handshake."""
+    try:
+        await get_llm_http_client().head("https://api.groq.com/openai/v1/models", timeout=5)
+        logger.info("[llm] Groq connection pool warmed")
+    except Exception as e:
+        logger.warning(f"[llm] Groq warmup failed (non-fatal): {e}")
+
+
+async def close_llm_http_client() -> None:
+    global _llm_http
+    if _llm_http is not None:
+        await _llm_http.aclose()
+        _llm_http = None
+
+
 # ── Constants ─────────────────────────────────────────────────────────────────
 
 GLOBAL_SAFETY_RULES = """You are a professional AI assistant operating within a multi-tenant platform.
@@ -67,6 +107,12 @@ CRITICAL RULES:
 - Protect user privacy. Never share one user's data with another.
 - Always respond in the language the user is speaking in."""
 
+# Prebuilt static prompt sections (only dynamic fields are formatted per request)
+_SAFETY_SECTION = "[SAFETY RULES]\n" + GLOBAL_SAFETY_RULES
+_LEARNED_EXAMPLES_HEADER = "[LEARNED EXAMPLES]\nUse these as reference for similar queries:\n"
+# {"tool": "<name>", "arguments": {...}} emitted by the model in agentic mode
+_TOOL_CALL_RE = re.compile(r'\{[^{}]*"tool":\s*"([^"]+)"[^{}]*"arguments":\s*(\{[^{}]*\})[^{}]*\}')
+
 GROQ_MODELS_ALLOWLIST = [
     "llama-3.3-70b-versatile",
     "llama-3.1-8b-instant",
@@ -75,6 +121,7 @@ GROQ_MODELS_ALLOWLIST = [
 ]
 
 CONVERSATION_TTL = 86400  # 24 hours
+LLM_CACHE_PREFIX = "llmcache:"
 MAX_CONVERSATION_TURNS = 20
 
 
@@ -91,7 +138,7 @@ async def get_conversation_history(
     try:
         data = await r.get(key)
         if data:
-            turns = json.loads(data)
+            turns = orjson.loads(data)
             return turns[-MAX_CONVERSATION_TURNS:]
     except Exception:
         logger.exception("Failed to load conversation history")
@@ -109,7 +156,7 @@ async def save_conversation_history(
     try:
         # Keep only last N turns
         trimmed = turns[-MAX_CONVERSATION_TURNS:]
-        await r.set(key, json.dumps(trimmed), ex=CONVERSATION_TTL)
+        await r.set(key, orjson.dumps(trimmed), ex=CONVERSATION_TTL)
     except Exception:
         logger.exception("Failed to save conversation history")
 
@@ -295,6 +342,257 @@ def _get_chroma_client():
     return _chroma_client
 
 
+# Collection handles by name: get_collection is an HTTP round-trip to Chroma,
+# so it is resolved once and reused; a failed query evicts the entry.
+_collections: dict[str, Any] = {}
+
+
+def _get_collection(client, collection_name: str):
+    collection = _collections.get(collection_name)
+    if collection is None:
+        collection = client.get_collection(collection_name)
+        _collections[collection_name] = collection
+    return collection
+
+
+def warm_retrieval() -> None:
+    """
+    Connect to ChromaDB and run one throwaway embedding so the first real
+    query doesn't pay model load and lazy imports. Errors are non-fatal.
+    """
+    try:
+        from app.services.ingestion_service import embed_query
+
+        _get_chroma_client()
+        embed_query("warmup")
+        logger.info("[rag] Retrieval pipeline warmed")
+    except Exception as e:
+        logger.warning(f"[rag] Retrieval warmup failed (non-fatal): {e}")
+
+
+def _format_semantic_results(data: dict) -> list[dict]:
+    """Convert a single-query ChromaDB result into scored retrieval dicts."""
+    import numpy as np
+
+    documents = data.get("documents", [[]])[0]
+    metadatas = data.get("metadatas", [[]])[0]
+    distances = data.get("distances", [[]])[0]
+    if not documents:
+        return []
+
+    # Vectorised distance → similarity; missing distances score as 0.5
+    dists = np.full(len(documents), 0.5, dtype=np.float64)
+    known = [d if d is not None else 0.5 for d in distances[: len(documents)]]
+    dists[: len(known)] = known
+    scores = np.maximum(1.0 - dists, 0.0)
+    keep = np.nonzero([bool(doc) for doc in documents])[0]
+
+    n_meta = len(metadatas)
+    return [
+        {
+            "content": documents[i],
+            "metadata": metadatas[i] if i < n_meta else {},
+            "score": float(scores[i]),
+            "retrieval_type": "semantic",
+        }
+        for i in keep.tolist()
+    ]
+
+
+# In-memory embedding matrices keyed by "tenant:agent" → (loaded_at, matrix, docs, metas),
+# least recently used first; at most EMBED_INMEM_MAX_AGENTS corpora are kept.
+# matrix is None when the corpus exceeds EMBED_INMEM_MAX_DOCS (use Chroma instead).
+# Loads run in executor threads, so all access goes through _inmem_lock. Each
+# invalidation bumps its tenant's generation; a load that overlapped one is
+# returned to its caller but not cached.
+_inmem_indexes: OrderedDict[str, tuple[float, Any, list[str], list[dict]]] = OrderedDict()
+_inmem_generations: dict[str, int] = {}
+_inmem_lock = threading.Lock()
+
+
+def _get_inmem_index(collection, tenant_id: str, agent_id: str, where: Optional[dict]):
+    """
+    Load (or reuse) an L2-normalised embedding matrix for a tenant+agent corpus.
+    Entries expire after EMBED_INMEM_TTL seconds and are dropped on ingestion or
+    deletion, so newly ingested chunks appear. Returns None when the corpus is
+    too large or empty.
+    """
+    import numpy as np
+
+    key = f"{tenant_id}:{agent_id}"
+    now = time.monotonic()
+    with _inmem_lock:
+        cached = _inmem_indexes.get(key)
+        if cached and now - cached[0] < settings.EMBED_INMEM_TTL:
+            _inmem_indexes.move_to_end(key)
+            return cached if cached[1] is not None else None
+        generation = _inmem_generations.get(tenant_id, 0)
+
+    max_docs = settings.EMBED_INMEM_MAX_DOCS
+    get_kwargs: dict[str, Any] = {
+        "include": ["embeddings", "documents", "metadatas"],
+        "limit": max_docs + 1,
+    }
+    if where:
+        get_kwargs["where"] = where
+    data = collection.get(**get_kwargs)
+
+    embeddings = data.get("embeddings")
+    documents = data.get("documents") or []
+    if embeddings is None or not len(embeddings) or len(documents) > max_docs:
+        _store_inmem_index(tenant_id, key, (now, None, [], []), generation)
+        return None
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+
+    entry = (now, matrix, documents, data.get("metadatas") or [])
+    _store_inmem_index(tenant_id, key, entry, generation)
+    logger.info(f"[rag] In-memory index loaded for {key}: {len(documents)} chunks")
+    return entry
+
+
+def _store_inmem_index(tenant_id: str, key: str, entry: tuple, generation: int) -> None:
+    """
+    Insert an in-memory index as most recently used, evicting the oldest past
+    the cap. Skipped if the tenant was invalidated since the load started.
+    """
+    with _inmem_lock:
+        if _inmem_generations.get(tenant_id, 0) != generation:
+            return
+        _inmem_indexes[key] = entry
+        _inmem_indexes.move_to_end(key)
+        while len(_inmem_indexes) > max(1, settings.EMBED_INMEM_MAX_AGENTS):
+            _inmem_indexes.popitem(last=False)
+
+
+def invalidate_inmem_index(tenant_id: str, agent_id: str) -> None:
+    """
+    Drop in-memory indexes after an agent's chunks change. Every agent's corpus
+    also includes the tenant's "knowledge_base" chunks, so a change there drops
+    all of the tenant's indexes.
+    """
+    prefix = f"{tenant_id}:"
+    with _inmem_lock:
+        _inmem_generations[tenant_id] = _inmem_generations.get(tenant_id, 0) + 1
+        if agent_id == "knowledge_base":
+            for key in [k for k in _inmem_indexes if k.startswith(prefix)]:
+                del _inmem_indexes[key]
+        else:
+            _inmem_indexes.pop(prefix + agent_id, None)
+
+
+def _inmem_search(index: tuple, q_vec: list[float], top_k: int) -> list[dict]:
+    """
+    Exact cosine top-k over an in-memory index (one GEMV instead of a Chroma query).
+    Query vectors from embed_query are already unit length, so no re-normalisation.
+    """
+    import numpy as np
+
+    _, matrix, documents, metadatas = index
+    q = np.asarray(q_vec, dtype=np.float32)
+
+    scores = matrix @ q
+    k = min(top_k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    n_meta = len(metadatas)
+    return [
+        {
+            "content": documents[i],
+            "metadata": (metadatas[i] if i < n_meta else None) or {},
+            "score": max(0.0, float(scores[i])),
+            "retrieval_type": "semantic",
+        }
+        for i in top.tolist()
+        if documents[i]
+    ]
+
+
+class _QueryBatcher:
+    """
+    Coalesce concurrent semantic queries into one ChromaDB call.
+
+    Queries sharing a (tenant, agent, top_k) key that arrive within `window`
+    seconds (or until `max_batch` are queued) are embedded in one batched
+    forward pass and sent as a single multi-vector `collection.query`; each
+    caller gets its own slice of the result.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 16):
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: dict[tuple, list[tuple[str, asyncio.Future]]] = {}
+        # Strong references to in-flight flushes (the loop only keeps weak ones)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, collection, key: tuple, query: str, n_results: int, where: Optional[dict]) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        bucket = self._pending.get(key)
+        if bucket is None:
+            bucket = self._pending[key] = []
+            loop.call_later(self._window, self._dispatch, collection, key, bucket, n_results, where)
+        bucket.append((query, future))
+        if len(bucket) >= self._max_batch:
+            # Full batch — don't wait out the window
+            self._dispatch(collection, key, bucket, n_results, where)
+        return await future
+
+    def _dispatch(self, collection, key: tuple, bucket: list, n_results: int, where: Optional[dict]) -> None:
+        # The timer may fire after a size-triggered flush already sent this bucket
+        if self._pending.get(key) is not bucket:
+            return
+        del self._pending[key]
+        task = asyncio.ensure_future(self._flush(collection, bucket, n_results, where))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, collection, items: list, n_results: int, where: Optional[dict]) -> None:
+        """Run one batched query; any failure is raised to every waiting caller."""
+        try:
+            await self._query_batch(collection, items, n_results, where)
+        except BaseException as e:
+            for _, future in items:
+                if not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+    async def _query_batch(self, collection, items: list, n_results: int, where: Optional[dict]) -> None:
+        query_kwargs: dict[str, Any] = {"n_results": n_results}
+        if where:
+            query_kwargs["where"] = where
+
+        def _embed_and_query():
+            import numpy as np
+
+            from app.services.ingestion_service import embed_texts
+
+            # One contiguous float32 (n, dim) matrix rather than a list of rows
+            query_kwargs["query_embeddings"] = np.stack(embed_texts([query for query, _ in items]))
+            return collection.query(**query_kwargs)
+
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, _embed_and_query)
+
+        rows = {field: data.get(field) or [] for field in ("documents", "metadatas", "distances")}
+        for i, (_, future) in enumerate(items):
+            if not future.done():
+                future.set_result({
+                    field: [values[i] if i < len(values) else []]
+                    for field, values in rows.items()
+                })
+
+
+_query_batcher = _QueryBatcher()
+
+
 async def _semantic_search(
     tenant_id: str,
     agent_id: str,
@@ -306,55 +604,72 @@ async def _semantic_search(
     Collection: tenant_{tenantId}, filtered by agentId.
     """
     loop = asyncio.get_event_loop()
+    where = {"$or": [{"agentId": agent_id}, {"agentId": "knowledge_base"}]} if agent_id else None
 
-    def _do_query():
+    def _open_collection():
         client = _get_chroma_client()
         if not client:
-            return []
+            return None
 
         collection_name = f"tenant_{tenant_id}"
         try:
-            collection = client.get_collection(collection_name)
+            return _get_collection(client, collection_name)
         except Exception:
             logger.info(f"No ChromaDB collection found for {collection_name}")
-            return []
+            return None
 
-        try:
-            query_kwargs = {
-                "query_texts": [query],
-                "n_results": top_k,
-            }
-            if agent_id:
-                query_kwargs["where"] = {"$or": [{"agentId": agent_id}, {"agentId": "knowledge_base"}]}
-
-            data = collection.query(**query_kwargs)
-
-            documents = data.get("documents", [[]])[0]
-            metadatas = data.get("metadatas", [[]])[0]
-            distances = data.get("distances", [[]])[0]
-
-            results = []
-            for i, doc in enumerate(documents):
-                if doc:
-                    score = 1.0 - (distances[i] if i < len(distances) else 0.5)
-                    results.append({
-                        "content": doc,
-                        "metadata": metadatas[i] if i < len(metadatas) else {},
-                        "score": max(0, score),
-                        "retrieval_type": "semantic",
-                    })
-            return results
-        except Exception:
-            logger.exception("ChromaDB query failed")
+    def _do_query():
+        collection = _open_collection()
+        if collection is None:
             return []
 
+        # Embed with the ingestion model — Chroma's query_texts path would use
+        # its own default embedder, which doesn't match the stored vectors.
+        from app.services.ingestion_service import embed_query
+
+        q_vec = embed_query(query)
+
+        if settings.EMBED_INMEM:
+            index = _get_inmem_index(collection, tenant_id, agent_id, where)
+            if index is not None:
+                return _inmem_search(index, q_vec, top_k)
+
+        query_kwargs = {
+            "query_embeddings": [q_vec],
+            "n_results": top_k,
+        }
+        if where:
+            query_kwargs["where"] = where
+
+        data = collection.query(**query_kwargs)
+        return _format_semantic_results(data)
+
     try:
+        if settings.BATCH_SEARCH and not settings.EMBED_INMEM:
+            collection = await loop.run_in_executor(None, _open_collection)
+            if collection is None:
+                return []
+            data = await _query_batcher.submit(
+                collection, (tenant_id, agent_id, top_k), query, top_k, where
+            )
+            return _format_semantic_results(data)
         return await loop.run_in_executor(None, _do_query)
     except Exception:
-        logger.exception("Semantic search executor failed")
+        logger.exception("ChromaDB query failed")
+        _collections.pop(f"tenant_{tenant_id}", None)
         return []
 
 
+# Parsed BM25 models keyed by Redis key, reused while the stored payload is unchanged
+_BM25_CACHE_MAX = 32
+_bm25_models: dict[str, tuple[int, Any, list[str], list[dict]]] = {}
+
+
+@lru_cache(maxsize=4096)
+def _tokenize_query(query: str) -> tuple[str, ...]:
+    return tuple(query.lower().split())
+
+
 async def _bm25_search(
     tenant_id: str,
     agent_id: str,
@@ -375,22 +690,28 @@ async def _bm25_search(
         if not data:
             return []
 
-        bm25_data = json.loads(data)
-        documents = bm25_data.get("documents", [])
-        ids = bm25_data.get("ids", [])
-        metadatas = bm25_data.get("metadatas", [])
-        tokenized = bm25_data.get("tokenized", [])
+        data_hash = hash(data)
+        cached = _bm25_models.get(key)
+        if cached and cached[0] == data_hash:
+            _, bm25, documents, metadatas = cached
+        else:
+            bm25_data = orjson.loads(data)
+            documents = bm25_data.get("documents", [])
+            metadatas = bm25_data.get("metadatas", [])
+            tokenized = bm25_data.get("tokenized", [])
 
-        if not documents or not tokenized:
-            return []
+            if not documents or not tokenized:
+                return []
 
-        # Build BM25 index
-        from rank_bm25 import BM25Okapi
-        bm25 = BM25Okapi(tokenized)
+            # Build BM25 index
+            from rank_bm25 import BM25Okapi
+            bm25 = BM25Okapi(tokenized)
+            if len(_bm25_models) >= _BM25_CACHE_MAX:
+                _bm25_models.pop(next(iter(_bm25_models)))
+            _bm25_models[key] = (data_hash, bm25, documents, metadatas)
 
         # Score query
-        query_tokens = query.lower().split()
-        scores = bm25.get_scores(query_tokens)
+        scores = bm25.get_scores(_tokenize_query(query))
 
         # Get top-K
         import numpy as np
@@ -437,23 +758,21 @@ async def query_documents(
         return bm25_results[:top_k]
 
     # Reciprocal Rank Fusion (k=60 is standard)
+    # Fused by in-process 64-bit content hash (str hashes are cached, no md5/encode)
     k = 60
-    rrf_scores: dict[str, float] = {}
-    doc_map: dict[str, dict] = {}
-
-    for rank, doc in enumerate(semantic_results):
-        content_hash = hashlib.md5(doc["content"].encode()).hexdigest()
-        rrf_scores[content_hash] = rrf_scores.get(content_hash, 0) + 1.0 / (k + rank + 1)
-        doc_map[content_hash] = doc
-
-    for rank, doc in enumerate(bm25_results):
-        content_hash = hashlib.md5(doc["content"].encode()).hexdigest()
-        rrf_scores[content_hash] = rrf_scores.get(content_hash, 0) + 1.0 / (k + rank + 1)
-        if content_hash not in doc_map:
-            doc_map[content_hash] = doc
-        else:
-            # Mark as found in both
-            doc_map[content_hash]["retrieval_type"] = "hybrid"
+    rrf_scores: dict[int, float] = {}
+    doc_map: dict[int, dict] = {}
+
+    for ranked in (semantic_results, bm25_results):
+        for rank, doc in enumerate(ranked):
+            content_hash = hash(doc["content"])
+            rrf_scores[content_hash] = rrf_scores.get(content_hash, 0) + 1.0 / (k + rank + 1)
+            seen = doc_map.get(content_hash)
+            if seen is None:
+                doc_map[content_hash] = doc
+            elif ranked is bm25_results:
+                # Mark as found in both
+                seen["retrieval_type"] = "hybrid"
 
     # Sort by RRF score and return top-K
     sorted_hashes = sorted(rrf_scores.keys(), key=lambda h: rrf_scores[h], reverse=True)
@@ -481,27 +800,34 @@ def apply_policy_scoring(
     if not policy_rules:
         return documents
 
+    # Normalise rules once instead of once per document
+    rules = [
+        (
+            rule.get("action", "allow"),
+            str(rule.get("target", "")).lower(),
+            rule.get("type", "topic"),
+        )
+        for rule in policy_rules
+        if isinstance(rule, dict)
+    ]
+
     for doc in documents:
         content = doc.get("content", "").lower()
         metadata = doc.get("metadata", {})
         source = str(metadata.get("source", "")).lower()
+        tags = None
 
-        for rule in policy_rules:
-            if not isinstance(rule, dict):
-                continue
-            action = rule.get("action", "allow")
-            target = str(rule.get("target", "")).lower()
-            match_type = rule.get("type", "topic")
-
+        for action, target, match_type in rules:
             matched = False
             if match_type == "topic" and target:
                 matched = target in content
             elif match_type == "documentSource" and target:
                 matched = target in source
             elif match_type == "documentTag":
-                tags = metadata.get("tags", [])
-                if isinstance(tags, list):
-                    matched = target in [t.lower() for t in tags]
+                if tags is None:
+                    raw_tags = metadata.get("tags", [])
+                    tags = {t.lower() for t in raw_tags} if isinstance(raw_tags, list) else set()
+                matched = target in tags
 
             if matched:
                 if action == "restrict":
@@ -531,7 +857,11 @@ def build_system_prompt(ctx: dict) -> str:
     sections = []
 
     # Section 1: Global Safety
-    sections.append(f"[SAFETY RULES]\n{ctx['globalRules']}")
+    global_rules = ctx["globalRules"]
+    if global_rules == GLOBAL_SAFETY_RULES:
+        sections.append(_SAFETY_SECTION)
+    else:
+        sections.append("[SAFETY RULES]\n" + global_rules)
 
     # Section 2: Tenant Context
     tenant_parts = []
@@ -540,7 +870,7 @@ def build_system_prompt(ctx: dict) -> str:
     if ctx.get("tenantIndustry"):
         tenant_parts.append(f"Industry: {ctx['tenantIndustry']}.")
     if tenant_parts:
-        sections.append(f"[ORGANIZATION]\n" + " ".join(tenant_parts))
+        sections.append("[ORGANIZATION]\n" + " ".join(tenant_parts))
 
     # Section 3: Brand Guidelines
     brand_parts = []
@@ -551,7 +881,7 @@ def build_system_prompt(ctx: dict) -> str:
     if ctx.get("brandRestrictedTopics"):
         brand_parts.append(f"NEVER discuss: {', '.join(ctx['brandRestrictedTopics'])}")
     if brand_parts:
-        sections.append(f"[BRAND GUIDELINES]\n" + "\n".join(brand_parts))
+        sections.append("[BRAND GUIDELINES]\n" + "\n".join(brand_parts))
 
     # Section 4: Agent Configuration
     agent_parts = []
@@ -579,19 +909,15 @@ def build_system_prompt(ctx: dict) -> str:
         if boundaries:
             agent_parts.append(f"Never discuss or answer questions about:\n{boundaries}")
     if agent_parts:
-        sections.append(f"[AGENT]\n" + "\n".join(agent_parts))
+        sections.append("[AGENT]\n" + "\n".join(agent_parts))
 
     # Section 5: Few-Shot Examples (from retraining)
     if ctx.get("fewShotExamples"):
-        examples_text = []
-        for ex in ctx["fewShotExamples"]:
-            examples_text.append(
-                f"User: {ex['userQuery']}\nIdeal Response: {ex['idealResponse']}"
-            )
-        sections.append(
-            f"[LEARNED EXAMPLES]\nUse these as reference for similar queries:\n"
-            + "\n---\n".join(examples_text)
+        examples_text = "\n---\n".join(
+            f"User: {ex['userQuery']}\nIdeal Response: {ex['idealResponse']}"
+            for ex in ctx["fewShotExamples"]
         )
+        sections.append(_LEARNED_EXAMPLES_HEADER + examples_text)
 
     # Section 6: Escalation Rules
     esc_parts = []
@@ -606,7 +932,7 @@ def build_system_prompt(ctx: dict) -> str:
             if isinstance(rule, dict):
                 esc_parts.append(f"- {rule.get('condition', '')} → {rule.get('action', '')}")
     if esc_parts:
-        sections.append(f"[ESCALATION]\n" + "\n".join(esc_parts))
+        sections.append("[ESCALATION]\n" + "\n".join(esc_parts))
 
     # Section 7: Active Policy Summary
     policy_parts = []
@@ -619,7 +945,7 @@ def build_system_prompt(ctx: dict) -> str:
             elif action == "require" and target:
                 policy_parts.append(f"REQUIRED: {target}")
     if policy_parts:
-        sections.append(f"[ACTIVE POLICIES]\n" + "\n".join(policy_parts))
+        sections.append("[ACTIVE POLICIES]\n" + "\n".join(policy_parts))
 
     # Section 8: Contact Variables (outbound campaign context)
     contact_vars = ctx.get("contact_variables")
@@ -643,6 +969,59 @@ def build_system_prompt(ctx: dict) -> str:
 # ── 6. Groq LLM Generation ───────────────────────────────────────────────────
 
 MAX_RETRIES = 4
+_RETRY_AFTER_RE = re.compile(r"try again in ([\d.]+)s")
+_LLM_UNAVAILABLE_MSG = "I'm sorry, the AI service is temporarily unavailable. Please try again."
+
+# Static parts of the knowledge-base context message (shared by both paths)
+_KB_CONTEXT_PREFIX = "[KNOWLEDGE BASE CONTEXT]\n"
+_KB_CONTEXT_INSTRUCTIONS = (
+    "Use the following information to answer the user's question. "
+    "If the information doesn't contain the answer, say so.\n\n"
+)
+
+def _build_context_text(chunks: list[dict]) -> str:
+    """
+    Join retrieved chunks (best first) up to MAX_CONTEXT_CHARS, dropping whole
+    lower-ranked chunks past the budget (and truncating a top chunk that alone
+    exceeds it) so oversized prompts never reach Groq.
+    """
+    budget = settings.MAX_CONTEXT_CHARS
+    parts: list[str] = []
+    used = 0
+    for chunk in chunks:
+        content = chunk.get("content")
+        if not content:
+            continue
+        used += len(content) + 2
+        if used > budget:
+            if not parts:
+                parts.append(content[:budget])
+            break
+        parts.append(content)
+    return "\n\n".join(parts)
+
+
+_LIST_STYLE_HINTS = ("list", "steps", "compare", "difference")
+
+
+def answer_token_budget(query: str, token_limit: int = 4096) -> int:
+    """
+    Generation ceiling sized to the question: short questions get 256 tokens,
+    list/compare-style ones 512, everything else 768 — never above the
+    agent's token limit. Groq schedules against the cap, so a tight one cuts
+    tail latency. Disabled (agent limit only) when DYNAMIC_MAX_TOKENS is off.
+    """
+    ceiling = min(token_limit, 4096)
+    if not settings.DYNAMIC_MAX_TOKENS:
+        return ceiling
+    lowered = query.lower()
+    if any(hint in lowered for hint in _LIST_STYLE_HINTS):
+        budget = 512
+    elif len(query.split()) < 12:
+        budget = 256
+    else:
+        budget = 768
+    return min(ceiling, budget)
 
 
 def _resolve_groq_key(tenant: Optional[Tenant]) -> Optional[str]:
@@ -669,10 +1048,7 @@ async def generate_response(
 ) -> str:
     """Call Groq with context, history, and retry logic."""
     # Build context from retrieved documents
-    context_text = ""
-    if context_chunks:
-        chunk_texts = [c["content"] for c in context_chunks if c.get("content")]
-        context_text = "\n\n".join(chunk_texts)
+    context_text = _build_context_text(context_chunks)
 
     # Build messages array
     messages = [{"role": "system", "content": system_prompt}]
@@ -681,7 +1057,7 @@ async def generate_response(
     if context_text:
         messages.append({
             "role": "system",
-            "content": f"[KNOWLEDGE BASE CONTEXT]\nUse the following information to answer the user's question. If the information doesn't contain the answer, say so.\n\n{context_text}",
+            "content": "".join((_KB_CONTEXT_PREFIX, _KB_CONTEXT_INSTRUCTIONS, context_text)),
         })
 
     # Add conversation history
@@ -693,52 +1069,124 @@ async def generate_response(
     # Add current query
     messages.append({"role": "user", "content": query})
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        for attempt in range(MAX_RETRIES):
-            try:
-                resp = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {groq_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "max_tokens": min(token_limit, 4096),
-                        "temperature": 0.7,
-                    },
-                )
+    # Exact-prompt cache: identical messages + model + sampling params → stored answer
+    max_tokens = answer_token_budget(query, token_limit)
+    temperature = 0.7
+    cache_key = None
+    r = await get_redis() if settings.LLM_CACHE else None
+    if r:
+        digest = hashlib.sha256(
+            f"{model}|{temperature}|{max_tokens}|{json.dumps(messages)}".encode()
+        ).hexdigest()
+        cache_key = LLM_CACHE_PREFIX + digest
+        try:
+            cached = await r.get(cache_key)
+            if cached is not None:
+                return cached
+        except Exception:
+            logger.exception("Failed to read LLM response cache")
 
-                if resp.status_code == 200:
-                    return resp.json()["choices"][0]["message"]["content"]
+    client = get_llm_http_client()
+    for attempt in range(MAX_RETRIES):
+        try:
+            resp = await client.post(
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {groq_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": model,
+                    "messages": messages,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                },
+            )
 
-                if resp.status_code == 429:
-                    wait = 2.0 * (attempt + 1)
+            if resp.status_code == 200:
+                answer = orjson.loads(resp.content)["choices"][0]["message"]["content"]
+                if cache_key:
                     try:
-                        body = resp.json()
-                        msg = body.get("error", {}).get("message", "")
-                        m = re.search(r"try again in ([\d.]+)s", msg)
-                        if m:
-                            wait = float(m.group(1)) + 0.5
+                        await r.set(cache_key, answer, ex=settings.LLM_CACHE_TTL)
                     except Exception:
-                        pass
-                    logger.info(f"Groq 429 — retry in {wait:.1f}s (attempt {attempt+1}/{MAX_RETRIES})")
-                    await asyncio.sleep(wait)
-                    continue
+                        logger.exception("Failed to write LLM response cache")
+                return answer
 
-                logger.warning(f"Groq API error: {resp.status_code}")
-                break
-            except Exception:
-                logger.exception(f"Groq request failed (attempt {attempt+1})")
-                if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(1)
+            if resp.status_code == 429:
+                wait = 2.0 * (attempt + 1)
+                try:
+                    body = resp.json()
+                    msg = body.get("error", {}).get("message", "")
+                    m = _RETRY_AFTER_RE.search(msg)
+                    if m:
+                        wait = float(m.group(1)) + 0.5
+                except Exception:
+                    pass
+                logger.info(f"Groq 429 — retry in {wait:.1f}s (attempt {attempt+1}/{MAX_RETRIES})")
+                await asyncio.sleep(wait)
+                continue
+
+            logger.warning(f"Groq API error: {resp.status_code}")
+            break
+        except Exception:
+            logger.exception(f"Groq request failed (attempt {attempt+1})")
+            if attempt < MAX_RETRIES - 1:
+                await asyncio.sleep(1)
 
-    return "I'm sorry, the AI service is temporarily unavailable. Please try again."
+    return _LLM_UNAVAILABLE_MSG
 
 
 # ── 7. Full RAG Pipeline ─────────────────────────────────────────────────────
 
+class _SemanticCache:
+    """
+    Recent first-turn answers per tenant/agent/model, looked up by cosine
+    similarity of the query embedding. A paraphrase of a recently answered
+    question skips retrieval and the LLM call entirely.
+    """
+
+    def __init__(self, max_entries: int = 256, max_namespaces: int = 1024):
+        self._max_entries = max_entries
+        self._max_namespaces = max_namespaces
+        # Entries are appended in time order, so expiry only ever pops from the
+        # left; namespaces are kept in LRU order and evicted past the cap.
+        self._entries: "OrderedDict[str, deque[tuple[float, Any, dict]]]" = OrderedDict()
+
+    def get(self, namespace: str, q_vec: list[float]) -> Optional[dict]:
+        import numpy as np
+
+        entries = self._entries.get(namespace)
+        if not entries:
+            return None
+        cutoff = time.monotonic() - settings.SEMANTIC_CACHE_TTL
+        while entries and entries[0][0] <= cutoff:
+            entries.popleft()
+        if not entries:
+            del self._entries[namespace]
+            return None
+
+        sims = np.stack([e[1] for e in entries]) @ np.asarray(q_vec, dtype=np.float32)
+        best = int(np.argmax(sims))
+        if sims[best] < settings.SEMANTIC_CACHE_THRESHOLD:
+            return None
+        return entries[best][2]
+
+    def put(self, namespace: str, q_vec: list[float], result: dict) -> None:
+        import numpy as np
+
+        entries = self._entries.get(namespace)
+        if entries is None:
+            entries = self._entries[namespace] = deque(maxlen=self._max_entries)
+        else:
+            self._entries.move_to_end(namespace)
+        entries.append((time.monotonic(), np.asarray(q_vec, dtype=np.float32), result))
+        while len(self._entries) > self._max_namespaces:
+            self._entries.popitem(last=False)
+
+
+_semantic_cache = _SemanticCache()
+
+
 async def process_query(
     db: AsyncSession,
     tenant_id: str,
@@ -755,11 +1203,42 @@ async def process_query(
     5. Generate response with conversation history
     6. Save conversation turn
     """
-    # 1. Assemble context
-    ctx = await assemble_context(db, tenant_id, agent_id, session_id)
+    # 1. Assemble context while ChromaDB/BM25 retrieval runs in the background
+    # (retrieval doesn't touch the DB session; it is cancelled on a cache hit)
+    retrieval = asyncio.create_task(query_documents(tenant_id, agent_id, query))
+    try:
+        ctx = await assemble_context(db, tenant_id, agent_id, session_id)
+    except BaseException:
+        retrieval.cancel()
+        raise
+    history = ctx["conversationHistory"]
+
+    # 1b. Semantic cache — only for first turns without per-contact context,
+    # since history and contact variables change the answer.
+    cache_ns = None
+    q_vec = None
+    if settings.SEMANTIC_CACHE and not history and not ctx.get("contact_variables"):
+        try:
+            from app.services.ingestion_service import embed_query
+
+            loop = asyncio.get_running_loop()
+            q_vec = await loop.run_in_executor(None, embed_query, query)
+            cache_ns = f"{tenant_id}:{agent_id}:{ctx['model']}"
+            cached = _semantic_cache.get(cache_ns, q_vec)
+        except Exception:
+            logger.exception("[rag] Semantic cache lookup failed")
+            cache_ns = None
+            cached = None
+        if cached is not None:
+            retrieval.cancel()
+            logger.info(f"[rag] Semantic cache hit for {tenant_id}:{agent_id}")
+            history.append({"role": "user", "content": query})
+            history.append({"role": "assistant", "content": cached["response"]})
+            await save_conversation_history(tenant_id, agent_id, session_id, history)
+            return dict(cached)
 
     # 2. Query ChromaDB
-    retrieved_docs = await query_documents(tenant_id, agent_id, query)
+    retrieved_docs = await retrieval
 
     # 3. Apply policy scoring
     if retrieved_docs and ctx.get("mergedPolicies"):
@@ -791,7 +1270,6 @@ async def process_query(
     )
 
     # 7. Save conversation turn
-    history = ctx["conversationHistory"]
     history.append({"role": "user", "content": query})
     history.append({"role": "assistant", "content": response_text})
     await save_conversation_history(tenant_id, agent_id, session_id, history)
@@ -803,15 +1281,18 @@ async def process_query(
         sources.append({
             "source": meta.get("source", "unknown"),
             "score": round(doc.get("score", 0), 3),
-            "snippet": doc.get("content", "")[:200],
+            "snippet": meta.get("preview") or doc.get("content", "")[:200],
         })
 
-    return {
+    result = {
         "response": response_text,
         "sources": sources,
         "model": ctx["model"],
         "documentsRetrieved": len(retrieved_docs),
     }
+    if cache_ns and response_text != _LLM_UNAVAILABLE_MSG:
+        _semantic_cache.put(cache_ns, q_vec, result)
+    return result
 
 
 # ── 8. LLM Provider Abstraction ──────────────────────────────────────────────
@@ -830,16 +1311,49 @@ class LLMClient:
         model: str,
         provider: str,
         api_key: str,
+        max_tokens: Optional[int] = None,
     ):
         """
         Yield tokens from the LLM as they arrive.
 
+        The first token is passed through immediately (TTFT); later tokens are
+        coalesced until LLM_STREAM_COALESCE_CHARS characters or
+        LLM_STREAM_COALESCE_MS have accumulated, so downstream consumers see
+        fewer, larger chunks.
+
         provider: "groq" | "openai" | "gemini" | "ollama"
         """
         provider = (provider or "groq").lower()
         stream_fn = self._resolve_provider(provider)
-        async for token in stream_fn(messages, model, api_key):
-            yield token
+        min_chars = settings.LLM_STREAM_COALESCE_CHARS
+        if min_chars <= 1:
+            async for token in stream_fn(messages, model, api_key, max_tokens):
+                yield token
+            return
+
+        window = settings.LLM_STREAM_COALESCE_MS / 1000
+        buf: list[str] = []
+        buf_len = 0
+        first = True
+        last = time.monotonic()
+        async for token in stream_fn(messages, model, api_key, max_tokens):
+            if not token:
+                continue
+            if first:
+                first = False
+                last = time.monotonic()
+                yield token
+                continue
+            buf.append(token)
+            buf_len += len(token)
+            now = time.monotonic()
+            if buf_len >= min_chars or now - last >= window:
+                yield "".join(buf)
+                buf.clear()
+                buf_len = 0
+                last = now
+        if buf:
+            yield "".join(buf)
 
     def _resolve_provider(self, provider: str):
         """Return the streaming coroutine method for the given provider."""
@@ -856,7 +1370,9 @@ class LLMClient:
 
     # ── Groq (SSE via httpx) ──────────────────────────────────────────────────
 
-    async def _stream_groq(self, messages: list[dict], model: str, api_key: str):
+    async def _stream_groq(
+        self, messages: list[dict], model: str, api_key: str, max_tokens: Optional[int] = None
+    ):
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -867,43 +1383,52 @@ class LLMClient:
             "stream": True,
             "temperature": 0.7,
         }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                async with client.stream(
-                    "POST",
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                ) as resp:
-                    if resp.status_code != 200:
-                        logger.warning("[llm_client] groq stream status=%s", resp.status_code)
-                        return
-                    async for line in resp.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
-                            try:
-                                chunk = json.loads(data)
-                                delta = chunk["choices"][0]["delta"].get("content", "")
-                                if delta:
-                                    yield delta
-                            except (json.JSONDecodeError, KeyError, IndexError):
-                                pass
+            client = get_llm_http_client()
+            async with client.stream(
+                "POST",
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers=headers,
+                json=payload,
+            ) as resp:
+                if resp.status_code != 200:
+                    logger.warning("[llm_client] groq stream status=%s", resp.status_code)
+                    return
+                async for line in resp.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = orjson.loads(data)
+                        except orjson.JSONDecodeError:
+                            continue
+                        # Usage / finish chunks carry no choices or an empty delta
+                        choices = chunk.get("choices")
+                        if choices:
+                            delta = (choices[0].get("delta") or {}).get("content")
+                            if delta:
+                                yield delta
         except Exception as exc:
             logger.error("[llm_client] groq stream error: %s", type(exc).__name__)
 
     # ── OpenAI ────────────────────────────────────────────────────────────────
 
-    async def _stream_openai(self, messages: list[dict], model: str, api_key: str):
+    async def _stream_openai(
+        self, messages: list[dict], model: str, api_key: str, max_tokens: Optional[int] = None
+    ):
         try:
             from openai import AsyncOpenAI  # type: ignore
 
             client = AsyncOpenAI(api_key=api_key)
+            extra: dict[str, Any] = {"max_tokens": max_tokens} if max_tokens else {}
             stream = await client.chat.completions.create(
                 model=model or "gpt-4o-mini",
                 messages=messages,
                 stream=True,
+                **extra,
             )
             async for chunk in stream:
                 delta = chunk.choices[0].delta.content
@@ -911,14 +1436,16 @@ class LLMClient:
                     yield delta
         except ImportError:
             logger.warning("[llm_client] openai package not installed, falling back to httpx SSE")
-            async for token in self._stream_groq(messages, model, api_key):
+            async for token in self._stream_groq(messages, model, api_key, max_tokens):
                 yield token
         except Exception as exc:
             logger.error("[llm_client] openai stream error: %s", type(exc).__name__)
 
     # ── Gemini ────────────────────────────────────────────────────────────────
 
-    async def _stream_gemini(self, messages: list[dict], model: str, api_key: str):
+    async def _stream_gemini(
+        self, messages: list[dict], model: str, api_key: str, max_tokens: Optional[int] = None
+    ):
         try:
             import google.generativeai as genai  # type: ignore
 
@@ -944,7 +1471,9 @@ class LLMClient:
                 resp = gemini_model.generate_content(
                     history,
                     stream=True,
-                    generation_config=genai.types.GenerationConfig(temperature=0.7),
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=0.7, max_output_tokens=max_tokens
+                    ),
                 )
                 for chunk in resp:
                     if chunk.text:
@@ -954,19 +1483,24 @@ class LLMClient:
             queue: asyncio.Queue = asyncio.Queue()
 
             async def _producer():
+                # The queue is unbounded, so put_nowait via call_soon_threadsafe
+                # hands each token over without a coroutine + Task per token.
                 def _run():
-                    for token in _gen():
-                        asyncio.run_coroutine_threadsafe(queue.put(token), loop)
-                    asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+                    try:
+                        for token in _gen():
+                            loop.call_soon_threadsafe(queue.put_nowait, token)
+                    finally:
+                        loop.call_soon_threadsafe(queue.put_nowait, None)
 
                 await loop.run_in_executor(None, _run)
 
-            asyncio.create_task(_producer())
+            producer = asyncio.create_task(_producer())
             while True:
                 token = await queue.get()
                 if token is None:
                     break
                 yield token
+            await producer
 
         except ImportError:
             logger.warning("[llm_client] google-generativeai not installed")
@@ -975,7 +1509,9 @@ class LLMClient:
 
     # ── Ollama (local) ────────────────────────────────────────────────────────
 
-    async def _stream_ollama(self, messages: list[dict], model: str, api_key: str):
+    async def _stream_ollama(
+        self, messages: list[dict], model: str, api_key: str, max_tokens: Optional[int] = None
+    ):
         """Stream from a local Ollama instance (api_key ignored)."""
         try:
             import ollama  # type: ignore
@@ -985,6 +1521,7 @@ class LLMClient:
                 model=model or "llama3",
                 messages=messages,
                 stream=True,
+                options={"num_predict": max_tokens} if max_tokens else None,
             ):
                 content = chunk.get("message", {}).get("content", "")
                 if content:
@@ -1044,47 +1581,96 @@ async def process_query_streaming(
     Streaming RAG pipeline.
 
     1. Assemble context (5-layer + optional contact variables)
-    2. Retrieve docs (Chroma + BM25)
+    2. Retrieve docs (Chroma + BM25), or replay a semantic cache hit
     3. Build system prompt
     4. Stream LLM tokens via LLMClient
     5. Handle function-calling tool use mid-stream
     6. Save full response to Redis history
     7. Yield each token
 
-    Yields: str tokens or {"tool_call": ..., "tool_result": ...} dicts for function calls.
+    Yields: str tokens, a leading {"filler": text} dict when STREAM_FILLER_TEXT is
+    set (speak only; not part of the answer), or {"tool_call": ..., "tool_result": ...}
+    dicts for function calls.
     """
-    # 1. Assemble context
-    ctx = await assemble_context(db, tenant_id, agent_id, session_id, contact_variables)
+    # 1+2. Assemble context and resolve the model while retrieval runs in the
+    # background (retrieval doesn't touch the DB session, so this is safe; it is
+    # cancelled on a semantic cache hit)
+    retrieval = asyncio.ensure_future(query_documents(tenant_id, agent_id, query))
+    cached = None
+    try:
+        # Optional filler so callers (TTS) can start speaking during retrieval.
+        # Typed so consumers speak it without adding it to the answer text,
+        # transcript or history.
+        if settings.STREAM_FILLER_TEXT:
+            yield {"filler": settings.STREAM_FILLER_TEXT}
+        ctx = await assemble_context(db, tenant_id, agent_id, session_id, contact_variables)
+        history = ctx["conversationHistory"]
+
+        # Resolve provider, key, model
+        result_t = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
+        tenant = result_t.scalar_one_or_none()
+
+        result_a = await db.execute(select(Agent).where(Agent.id == agent_id))
+        agent = result_a.scalar_one_or_none()
+        agent_prefs = (agent.llmPreferences or {}) if agent else {}
+
+        provider, api_key, model = _resolve_provider_and_key(tenant, agent_prefs)
+        custom_functions: list[dict] = agent_prefs.get("customFunctions", [])
+
+        # 2b. Semantic cache — same rules as process_query; agents with custom
+        # functions are skipped since tool results are live data.
+        cache_ns = None
+        q_vec = None
+        if (
+            settings.SEMANTIC_CACHE
+            and not history
+            and not ctx.get("contact_variables")
+            and not custom_functions
+        ):
+            try:
+                from app.services.ingestion_service import embed_query
+
+                loop = asyncio.get_running_loop()
+                q_vec = await loop.run_in_executor(None, embed_query, query)
+                cache_ns = f"{tenant_id}:{agent_id}:{provider}:{model}"
+                cached = _semantic_cache.get(cache_ns, q_vec)
+            except Exception:
+                logger.exception("[rag_streaming] Semantic cache lookup failed")
+                cache_ns = None
+                cached = None
+
+        if cached is None:
+            retrieved_docs = await retrieval
+    finally:
+        if not retrieval.done():
+            retrieval.cancel()
+
+    if cached is not None:
+        # Replay the stored answer as a single chunk
+        logger.info(f"[rag_streaming] Semantic cache hit for {tenant_id}:{agent_id}")
+        yield cached["response"]
+        history.append({"role": "user", "content": query})
+        history.append({"role": "assistant", "content": cached["response"]})
+        await save_conversation_history(tenant_id, agent_id, session_id, history)
+        return
 
-    # 2. Retrieve docs
-    retrieved_docs = await query_documents(tenant_id, agent_id, query)
     if retrieved_docs and ctx.get("mergedPolicies"):
         retrieved_docs = apply_policy_scoring(retrieved_docs, ctx["mergedPolicies"])
 
     # 3. Build system prompt
     system_prompt = build_system_prompt(ctx)
 
-    # Resolve provider, key, model
-    result_t = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
-    tenant = result_t.scalar_one_or_none()
-
-    result_a = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = result_a.scalar_one_or_none()
-    agent_prefs = (agent.llmPreferences or {}) if agent else {}
-
-    provider, api_key, model = _resolve_provider_and_key(tenant, agent_prefs)
-
     if not api_key and provider not in ("ollama",):
         yield "No AI API key configured. Please add an API key in Settings."
         return
 
     # 4. Build messages
-    context_text = "\n\n".join(c["content"] for c in retrieved_docs if c.get("content"))
+    context_text = _build_context_text(retrieved_docs)
     messages: list[dict] = [{"role": "system", "content": system_prompt}]
     if context_text:
         messages.append({
             "role": "system",
-            "content": f"[KNOWLEDGE BASE CONTEXT]\n{context_text}",
+            "content": _KB_CONTEXT_PREFIX + context_text,
         })
     for turn in ctx["conversationHistory"]:
         role = turn.get("role", "user")
@@ -1093,7 +1679,6 @@ async def process_query_streaming(
     messages.append({"role": "user", "content": query})
 
     # 5. Check for custom function definitions (function calling)
-    custom_functions: list[dict] = agent_prefs.get("customFunctions", [])
     full_response_parts: list[str] = []
 
     if custom_functions:
@@ -1115,10 +1700,7 @@ async def process_query_streaming(
             )
 
             # Parse tool call JSON if present
-            tool_match = re.search(
-                r'\{[^{}]*"tool":\s*"([^"]+)"[^{}]*"arguments":\s*(\{[^{}]*\})[^{}]*\}',
-                tool_check_response,
-            )
+            tool_match = _TOOL_CALL_RE.search(tool_check_response)
             if tool_match:
                 tool_use_detected = True
                 tool_name = tool_match.group(1)
@@ -1148,13 +1730,17 @@ async def process_query_streaming(
             logger.exception("[rag_streaming] function-calling error")
 
     # 6. Stream remaining response
-    async for token in _llm_client.stream_completion(messages, model, provider, api_key):
+    max_tokens = answer_token_budget(query, ctx["tokenLimit"])
+    async for token in _llm_client.stream_completion(
+        messages, model, provider, api_key, max_tokens=max_tokens
+    ):
         full_response_parts.append(token)
         yield token
 
     # 7. Save full response to Redis
     full_response = "".join(full_response_parts)
-    history = ctx["conversationHistory"]
     history.append({"role": "user", "content": query})
     history.append({"role": "assistant", "content": full_response})
     await save_conversation_history(tenant_id, agent_id, session_id, history)
+    if cache_ns and full_response:
+        _semantic_cache.put(cache_ns, q_vec, {"response": full_response})
@@ -5,6 +5,7 @@ Nightly cron job that:
 2. Embeds approved RetrainingExample ideal Q/A pairs into ChromaDB
 3. Marks them as retrained and creates tenant notifications
 """
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
@@ -76,6 +77,26 @@ async def extract_flagged_call_logs():
     return created
 
 
+def _upsert_examples(tenant_id: str, ids: list, documents: list, metadatas: list) -> None:
+    """
+    Upsert retraining examples through the ingestion client/collection helpers,
+    so the tenant collection always has the same HNSW metadata and embedding
+    model as ingested documents (never Chroma's defaults).
+    """
+    from app.services.ingestion_service import _get_chroma, _get_tenant_collection, embed_texts
+
+    chroma = _get_chroma()
+    if chroma is None:
+        raise RuntimeError("ChromaDB not available")
+    collection = _get_tenant_collection(chroma, tenant_id)
+    collection.upsert(
+        ids=ids,
+        documents=documents,
+        embeddings=embed_texts(documents, use_cache=False),
+        metadatas=metadatas,
+    )
+
+
 async def retrain_approved_examples():
     """Process all approved retraining examples across all tenants."""
     logger.info("[scheduler] Retraining job started")
@@ -110,15 +131,6 @@ async def retrain_approved_examples():
 
                 # Embed ideal responses into ChromaDB
                 try:
-                    import chromadb
-                    from app.config import settings
-                    chroma = chromadb.HttpClient(
-                        host=settings.CHROMA_HOST,
-                        port=settings.CHROMA_PORT,
-                    )
-                    collection_name = f"tenant_{agent.tenantId}"
-                    collection = chroma.get_or_create_collection(collection_name)
-
                     ids = []
                     documents = []
                     metadatas = []
@@ -136,10 +148,8 @@ async def retrain_approved_examples():
                         })
 
                     if ids:
-                        collection.upsert(
-                            ids=ids,
-                            documents=documents,
-                            metadatas=metadatas,
+                        await asyncio.get_event_loop().run_in_executor(
+                            None, _upsert_examples, agent.tenantId, ids, documents, metadatas,
                         )
 
                     # Mark as retrained
@@ -300,6 +300,9 @@ class StreamingOrchestrator:
                     if isinstance(token, str):
                         full_response_parts.append(token)
                         yield token
+                    elif isinstance(token, dict) and "filler" in token:
+                        # Spoken only — kept out of the response text and transcript
+                        yield token["filler"] + " "
 
         # ── Streaming TTS → μ-law chunks ──────────────────────────────────────
         await self.state.transition(call_sid, CallState.SPEAKING)
@@ -311,7 +314,7 @@ class StreamingOrchestrator:
             voice_id=tts_voice_id,
         ):
             # Convert WAV to μ-law 8kHz
-            mulaw_bytes = self.tts._wav_to_mulaw_8khz_mono(audio_chunk)
+            mulaw_bytes = await self.tts.wav_to_mulaw(audio_chunk)
 
             # Stream audio chunks, monitoring for barge-in
             for i in range(0, len(mulaw_bytes), _FRAME_BYTES):
@@ -90,6 +90,11 @@ class STTService:
         await loop.run_in_executor(None, _load_faster_whisper)
         await loop.run_in_executor(None, _load_vosk)
 
+    @property
+    def local_engine_available(self) -> bool:
+        """True once faster-whisper or Vosk has been loaded by initialize()."""
+        return _WHISPER_AVAILABLE or _VOSK_AVAILABLE
+
     async def _ensure_vosk_model(self) -> None:
         model_path = settings.VOSK_MODEL_PATH
         if os.path.isdir(model_path):
@@ -242,21 +247,21 @@ class STTService:
         return await loop.run_in_executor(None, _run)
 
     async def _transcribe_groq(self, pcm_bytes: bytes, sample_rate: int, groq_api_key: str) -> str:
-        import httpx
+        from app.services.rag_service import get_llm_http_client
 
         wav_bytes = _pcm_bytes_to_wav(pcm_bytes, sample_rate)
         buf = io.BytesIO(wav_bytes)
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(
-                    "https://api.groq.com/openai/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {groq_api_key}"},
-                    files={"file": ("audio.wav", buf, "audio/wav")},
-                    data={"model": "whisper-large-v3-turbo", "language": "en"},
-                )
-                if resp.status_code == 200:
-                    return resp.json().get("text", "").strip()
-                logger.warning("[stt] Groq Whisper returned %s", resp.status_code)
+            resp = await get_llm_http_client().post(
+                "https://api.groq.com/openai/v1/audio/transcriptions",
+                headers={"Authorization": f"Bearer {groq_api_key}"},
+                files={"file": ("audio.wav", buf, "audio/wav")},
+                data={"model": "whisper-large-v3-turbo", "language": "en"},
+                timeout=30,
+            )
+            if resp.status_code == 200:
+                return resp.json().get("text", "").strip()
+            logger.warning("[stt] Groq Whisper returned %s", resp.status_code)
         except Exception as exc:
             logger.warning("[stt] Groq Whisper request failed: %s", exc)
         return ""
@@ -1,17 +1,38 @@
+import asyncio
 import io
 import logging
 import re
-import wave
 from collections.abc import AsyncGenerator
 
 import httpx
-from pydub import AudioSegment
 
 from app.config import settings
 
 logger = logging.getLogger("voiceflow.tts_router")
 _SENTENCE_END_RE = re.compile(r"[.!?](?:\s|$)")
 
+# One pooled client for the Kokoro/Piper/Orpheus sidecars: streaming synthesis
+# posts once per sentence, so keep-alive connections are reused across calls.
+_tts_http: httpx.AsyncClient | None = None
+
+
+def get_tts_http_client() -> httpx.AsyncClient:
+    """Pooled client for the TTS sidecars (lazy init)."""
+    global _tts_http
+    if _tts_http is None or _tts_http.is_closed:
+        _tts_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(45.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _tts_http
+
+
+async def close_tts_http_client() -> None:
+    global _tts_http
+    if _tts_http is not None:
+        await _tts_http.aclose()
+        _tts_http = None
+
 
 class TTSRouter:
     async def synthesize(self, text: str, engine: str, voice_id: str, speed: float = 1.0) -> bytes:
@@ -43,13 +64,14 @@ class TTSRouter:
             buffer.append(chunk)
             token_count += len(chunk.split())
 
-            current = "".join(buffer).strip()
-            if not current:
-                continue
-
             # Flush on sentence boundaries or every ~64 whitespace-split tokens to
             # balance audio latency (~1-2 s) against synthesis request overhead.
-            if token_count >= 64 or _SENTENCE_END_RE.search(current):
+            # Only the new chunk can add a boundary (one ending an earlier chunk
+            # already flushed), so the buffer is joined once per flush.
+            if token_count >= 64 or _SENTENCE_END_RE.search(chunk):
+                current = "".join(buffer).strip()
+                if not current:
+                    continue
                 yield await self.synthesize(current, engine=engine, voice_id=voice_id)
                 buffer.clear()
                 token_count = 0
@@ -62,7 +84,12 @@ class TTSRouter:
     async def synthesize_mulaw(self, text: str, engine: str, voice_id: str, speed: float = 1.0) -> bytes:
         """Return μ-law 8kHz mono bytes for Twilio using pydub conversion."""
         audio_bytes = await self.synthesize(text=text, engine=engine, voice_id=voice_id, speed=speed)
-        return self._wav_to_mulaw_8khz_mono(audio_bytes)
+        return await self.wav_to_mulaw(audio_bytes)
+
+    async def wav_to_mulaw(self, wav_bytes: bytes) -> bytes:
+        """Run the pydub/ffmpeg μ-law conversion in the executor (it blocks for tens of ms)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._wav_to_mulaw_8khz_mono, wav_bytes)
 
     async def _synthesize_kokoro(self, text: str, voice_id: str, speed: float) -> bytes:
         payload = {
@@ -75,8 +102,7 @@ class TTSRouter:
         url = f"{settings.KOKORO_TTS_URL.rstrip('/')}/v1/audio/speech"
 
         try:
-            async with httpx.AsyncClient(timeout=45) as client:
-                resp = await client.post(url, json=payload)
+            resp = await get_tts_http_client().post(url, json=payload)
         except httpx.HTTPError as exc:
             raise RuntimeError(f"Kokoro synthesis transport error: {exc}") from exc
 
@@ -93,11 +119,11 @@ class TTSRouter:
             "response_format": "wav",
         }
 
-        async with httpx.AsyncClient(timeout=45) as client:
-            resp = await client.post(f"{base}/v1/audio/speech", json=payload)
-            if resp.status_code != 200:
-                logger.info("Piper /v1/audio/speech failed (%s), retrying /synthesize", resp.status_code)
-                resp = await client.post(f"{base}/synthesize", json=payload)
+        client = get_tts_http_client()
+        resp = await client.post(f"{base}/v1/audio/speech", json=payload)
+        if resp.status_code != 200:
+            logger.info("Piper /v1/audio/speech failed (%s), retrying /synthesize", resp.status_code)
+            resp = await client.post(f"{base}/synthesize", json=payload)
 
         if resp.status_code != 200:
             raise RuntimeError(f"Piper synthesis failed ({resp.status_code}): {resp.text[:400]}")
@@ -117,8 +143,7 @@ class TTSRouter:
             "max_tokens": 256,
         }
 
-        async with httpx.AsyncClient(timeout=45) as client:
-            resp = await client.post(settings.ORPHEUS_URL, json=payload)
+        resp = await get_tts_http_client().post(settings.ORPHEUS_URL, json=payload)
 
         if resp.status_code != 200:
             raise RuntimeError(f"Orpheus request failed ({resp.status_code}): {resp.text[:400]}")
@@ -135,16 +160,32 @@ class TTSRouter:
 
     @staticmethod
     def _wav_to_mulaw_8khz_mono(wav_bytes: bytes) -> bytes:
-        source = AudioSegment.from_file(io.BytesIO(wav_bytes), format="wav")
-        converted = source.set_channels(1).set_frame_rate(8000)
-
-        out = io.BytesIO()
-        converted.export(out, format="wav", codec="pcm_mulaw")
-        out.seek(0)
+        from pydub import AudioSegment  # lazy: probes PATH for ffmpeg on import
 
+        # pydub parses WAV and resamples in-process; only export() would shell
+        # out to ffmpeg, so the μ-law encode is done here instead of forking
+        # a process per synthesized sentence.
         try:
-            with wave.open(out, "rb") as wf:
-                return wf.readframes(wf.getnframes())
+            source = AudioSegment.from_file(io.BytesIO(wav_bytes), format="wav")
         except Exception:
-            logger.error("Failed to parse mu-law wav wrapper", exc_info=True)
+            logger.error("Failed to parse TTS wav output", exc_info=True)
             raise RuntimeError("mu-law conversion failed")
+        converted = source.set_channels(1).set_frame_rate(8000).set_sample_width(2)
+        return _pcm16_to_mulaw(converted.raw_data)
+
+
+def _pcm16_to_mulaw(pcm: bytes) -> bytes:
+    """Encode signed 16-bit little-endian PCM as G.711 μ-law."""
+    import numpy as np
+
+    # 14-bit magnitude + bias, segment = position of the leading bit (Sun g711.c)
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.int32) >> 2
+    mask = np.where(samples < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(samples), 8159) + 0x21
+    segment = np.frexp(magnitude)[1] - 6
+    uval = np.where(
+        segment >= 8,
+        0x7F,
+        (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F),
+    )
+    return (uval ^ mask).astype(np.uint8).tobytes()
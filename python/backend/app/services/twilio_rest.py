@@ -0,0 +1,64 @@
+"""
+Shared HTTP client for the Twilio REST API.
+
+Call updates (transfer, voicemail, hangup), outbound dials, WhatsApp
+replies and media downloads all go to api.twilio.com; a single pooled
+AsyncClient lets them reuse keep-alive TLS connections instead of paying a
+handshake per request.
+Credentials are per tenant, so auth is passed on each call.
+Also parses the form bodies of incoming Twilio webhooks.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional
+from urllib.parse import parse_qsl
+
+import httpx
+from fastapi import Request
+
+logger = logging.getLogger("voiceflow.twilio_rest")
+
+TWILIO_API_BASE = "https://api.twilio.com/2010-04-01"
+
+_twilio_http: Optional[httpx.AsyncClient] = None
+
+
+def get_twilio_http_client() -> httpx.AsyncClient:
+    """Pooled client for api.twilio.com (lazy init)."""
+    global _twilio_http
+    if _twilio_http is None or _twilio_http.is_closed:
+        _twilio_http = httpx.AsyncClient(
+            base_url=TWILIO_API_BASE,
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _twilio_http
+
+
+async def twilio_post(account_sid: str, auth_token: str, path: str, data: dict) -> httpx.Response:
+    """POST form data to /Accounts/{sid}/{path} (e.g. "Calls/CA123.json")."""
+    return await get_twilio_http_client().post(
+        f"/Accounts/{account_sid}/{path}",
+        auth=(account_sid, auth_token),
+        data=data,
+    )
+
+
+async def close_twilio_http_client() -> None:
+    global _twilio_http
+    if _twilio_http is not None:
+        await _twilio_http.aclose()
+        _twilio_http = None
+
+
+async def read_twilio_form(request: Request) -> dict[str, str]:
+    """
+    Parse a Twilio webhook body. Callbacks are small urlencoded forms, so they
+    are decoded straight from the body bytes instead of via request.form().
+    """
+    content_type = request.headers.get("content-type", "")
+    if "application/x-www-form-urlencoded" in content_type:
+        body = await request.body()
+        return dict(parse_qsl(body.decode(), keep_blank_values=True))
+    return dict(await request.form())
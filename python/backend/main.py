@@ -3,6 +3,7 @@ VoiceFlow Python Backend — main.py
 Drop-in replacement for Express backend. Same port (8000), same routes, same DB.
 Patent Claims: 9 (encryption), 13 (rate-limiting), 7 (scheduler), 8/12/15 (voice).
 """
+import asyncio
 import logging
 import time
 from contextlib import asynccontextmanager
@@ -20,6 +21,7 @@ from app.database import AsyncSessionLocal, get_db
 from app.auth import AuthContext, get_auth
 from app.models import Tenant, User, AgentTemplate
 from app.middleware import RequestLoggingMiddleware
+from app.responses import OrjsonResponse
 
 logger = logging.getLogger("voiceflow")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -140,7 +142,11 @@ async def seed_defaults():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    logger.info("Starting VoiceFlow Python backend...")
+    # uvicorn's loop="auto" uses uvloop when installed (uvicorn[standard], non-Windows)
+    logger.info(
+        "Starting VoiceFlow Python backend (event loop: %s)...",
+        type(asyncio.get_running_loop()).__module__.split(".")[0],
+    )
 
     # Verify DB connection
     try:
@@ -170,6 +176,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"[stt] STT init failed (non-fatal): {e}")
 
+    # Pre-open the pooled Groq connection and load the embedder + Chroma client
+    # in the background (neither blocks startup)
+    from app.services.rag_service import close_llm_http_client, warm_llm_http_client, warm_retrieval
+    llm_warmup = None
+    if settings.WARMUP_RETRIEVAL:
+        if settings.GROQ_API_KEY:
+            llm_warmup = asyncio.create_task(warm_llm_http_client())
+        asyncio.get_running_loop().run_in_executor(None, warm_retrieval)
+
     logger.info(f"Python backend ready on port {settings.PORT}")
 
     # Start retraining scheduler (Claim 7)
@@ -179,6 +194,15 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     stop_scheduler()
+    if llm_warmup is not None and not llm_warmup.done():
+        llm_warmup.cancel()
+    await close_llm_http_client()
+    from app.services.twilio_rest import close_twilio_http_client
+    await close_twilio_http_client()
+    from app.services.tts_router import close_tts_http_client
+    await close_tts_http_client()
+    from app.services.interaction_log import flush_interaction_log
+    await flush_interaction_log()
     logger.info("Shutting down...")
 
 
@@ -186,6 +210,7 @@ app = FastAPI(
     title="VoiceFlow API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=OrjsonResponse,
 )
 
 # ── Per-tenant rate limiting (Claim 13) ──────────────────────────────────────
@@ -312,5 +337,25 @@ async def twilio_numbers(auth: AuthContext = Depends(get_auth), db: AsyncSession
 
 
 if __name__ == "__main__":
+    from pathlib import Path
+
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
+
+    # Auto-reload only in development. uvicorn[standard] picks uvloop + httptools
+    # automatically where available (uvloop is not supported on Windows).
+    # app_dir / reload_dirs pin the import path and the watched tree to this
+    # directory, so `python backend/main.py` works from any CWD and the
+    # reloader doesn't watch e.g. the frontend's node_modules.
+    dev = settings.NODE_ENV == "development"
+    backend_dir = str(Path(__file__).resolve().parent)
+    uvicorn.run(
+        "main:app",
+        app_dir=backend_dir,
+        reload_dirs=[backend_dir] if dev else None,
+        host="0.0.0.0",
+        port=settings.PORT,
+        reload=dev,
+        http="auto" if dev else "httptools",
+        timeout_keep_alive=30,
+        limit_concurrency=None if dev else 1000,
+    )
@@ -8,6 +8,23 @@ from django.conf import settings
 
 TIMEOUT = 30.0
 
+# One pooled client per process: every page render makes several backend
+# calls, which now reuse keep-alive connections. The transport re-issues
+# requests that fail to connect (backend restarting, dropped keep-alive
+# socket) instead of surfacing them as a page error.
+_client: httpx.Client | None = None
+
+
+def _http() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            timeout=TIMEOUT,
+            transport=httpx.HTTPTransport(retries=3),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
 
 class BackendClient:
     def __init__(self, tenant_id: str = "", user_id: str = "", email: str = "", display_name: str = ""):
@@ -35,46 +52,41 @@ class BackendClient:
 
     # ── helpers ────────────────────────────────────────────────────────
     def _get(self, path, params=None):
-        with httpx.Client(timeout=TIMEOUT) as c:
-            r = c.get(self._url(path), headers=self._headers, params=params)
-            r.raise_for_status()
-            return r.json()
+        r = _http().get(self._url(path), headers=self._headers, params=params)
+        r.raise_for_status()
+        return r.json()
 
     def _post(self, path, json=None, data=None, files=None):
         headers = {k: v for k, v in self._headers.items() if k != "Content-Type"} if files else self._headers
-        with httpx.Client(timeout=TIMEOUT) as c:
-            r = c.post(self._url(path), headers=headers, json=json, data=data, files=files)
-            r.raise_for_status()
-            if r.status_code == 204:
-                return {}
-            return r.json()
+        r = _http().post(self._url(path), headers=headers, json=json, data=data, files=files)
+        r.raise_for_status()
+        if r.status_code == 204:
+            return {}
+        return r.json()
 
     def _put(self, path, json=None):
-        with httpx.Client(timeout=TIMEOUT) as c:
-            r = c.put(self._url(path), headers=self._headers, json=json)
-            r.raise_for_status()
-            if r.status_code == 204:
-                return {}
-            return r.json()
+        r = _http().put(self._url(path), headers=self._headers, json=json)
+        r.raise_for_status()
+        if r.status_code == 204:
+            return {}
+        return r.json()
 
     def _patch(self, path, json=None):
-        with httpx.Client(timeout=TIMEOUT) as c:
-            r = c.patch(self._url(path), headers=self._headers, json=json)
-            r.raise_for_status()
-            if r.status_code == 204:
-                return {}
-            return r.json()
+        r = _http().patch(self._url(path), headers=self._headers, json=json)
+        r.raise_for_status()
+        if r.status_code == 204:
+            return {}
+        return r.json()
 
     def _delete(self, path):
-        with httpx.Client(timeout=TIMEOUT) as c:
-            r = c.delete(self._url(path), headers=self._headers)
-            r.raise_for_status()
-            if r.status_code == 204:
-                return {}
-            try:
-                return r.json()
-            except Exception:
-                return {}
+        r = _http().delete(self._url(path), headers=self._headers)
+        r.raise_for_status()
+        if r.status_code == 204:
+            return {}
+        try:
+            return r.json()
+        except Exception:
+            return {}
 
     # ── Onboarding ─────────────────────────────────────────────────────
     def save_company_profile(self, data: dict):
@@ -0,0 +1,85 @@
+"""
+Tests for app/services/ingestion_service.py
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+pytest.importorskip("langchain_text_splitters")
+
+
+class _FakeCollection:
+    """In-memory stand-in for a Chroma collection (upsert/get/delete/count)."""
+
+    name = "tenant_t1"
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        for chunk_id, meta in zip(ids, metadatas):
+            self.rows[chunk_id] = meta
+
+    def get(self, where=None, include=None):
+        clauses = where.get("$and", [where]) if where else []
+        ids = [
+            chunk_id for chunk_id, meta in self.rows.items()
+            if all(meta.get(k) == v for clause in clauses for k, v in clause.items())
+        ]
+        return {"ids": ids}
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.rows.pop(chunk_id, None)
+
+    def count(self):
+        return len(self.rows)
+
+
+@pytest.fixture
+def ingestion(monkeypatch):
+    import app.services.ingestion_service as ing
+
+    collection = _FakeCollection()
+
+    class _Client:
+        def get_collection(self, name):
+            return collection
+
+    monkeypatch.setattr(ing, "_get_chroma", lambda: _Client())
+    monkeypatch.setattr(ing, "_get_tenant_collection", lambda client, tenant_id: collection)
+    monkeypatch.setattr(ing, "embed_texts", lambda texts, use_cache=True: [np.zeros(4, np.float32) for _ in texts])
+    monkeypatch.setattr(ing, "build_bm25_index", lambda tenant_id, agent_id: None)
+    return ing, collection
+
+
+@pytest.mark.asyncio
+async def test_reingesting_file_does_not_duplicate_chunks(ingestion, monkeypatch):
+    """Re-uploading a file (> 20 chunks) replaces its chunks, including ones stored under the old id scheme."""
+    ing, collection = ingestion
+    text = " ".join(f"Sentence {i} about the VoiceFlow product handbook." for i in range(1500))
+    monkeypatch.setattr(ing, "parse_document_with_docling", lambda path: text)
+
+    filename = "handbook.txt"
+    chunks = ing._clean_and_chunk(text, filename, {"filename": filename})
+    assert len(chunks) > 20
+
+    # Seed ids as the previous scheme built them: position within 20-chunk store batches
+    for start in range(0, len(chunks), 20):
+        for i, chunk in enumerate(chunks[start:start + 20]):
+            legacy_id = hashlib.sha256(
+                f"t1:a1:{filename}:{i}:{chunk['content'][:100]}".encode()
+            ).hexdigest()[:24]
+            collection.rows[legacy_id] = {"agentId": "a1", **chunk["metadata"]}
+    assert collection.count() == len(chunks)
+
+    await ing.ingest_file(text.encode(), filename, "t1", "a1")
+    assert collection.count() == len(chunks)
+
+    await ing.ingest_file(text.encode(), filename, "t1", "a1")
+    assert collection.count() == len(chunks)
@@ -0,0 +1,103 @@
+"""
+Tests for app/services/interaction_log.py
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+
+class _FakeSession:
+    """Records committed batches; optionally fails the first N commits."""
+
+    def __init__(self, store):
+        self._store = store
+        self._rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add_all(self, rows):
+        self._rows.extend(rows)
+
+    async def commit(self):
+        if self._store["fail"]:
+            self._store["fail"] -= 1
+            raise RuntimeError("database unavailable")
+        self._store["batches"].append(self._rows)
+
+
+@pytest.fixture
+def interaction_log(monkeypatch):
+    import app.services.interaction_log as il
+
+    store = {"batches": [], "fail": 0}
+    monkeypatch.setattr(il, "AsyncSessionLocal", lambda: _FakeSession(store))
+    monkeypatch.setattr(il, "CallLog", lambda **row: row)
+    monkeypatch.setattr(il, "_queue", None)
+    monkeypatch.setattr(il, "_drainer", None)
+    return il, store
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_single_turn_is_written_without_waiting_for_a_full_batch(interaction_log):
+    il, store = interaction_log
+    il.log_interaction("t1", "a1", "hi", "hello")
+    await _settle()
+
+    assert len(store["batches"]) == 1
+    row = store["batches"][0][0]
+    assert row["tenantId"] == "t1" and row["agentId"] == "a1"
+    await il.flush_interaction_log()
+
+
+@pytest.mark.asyncio
+async def test_queued_turns_are_written_in_batches_of_batch_size(interaction_log, monkeypatch):
+    il, store = interaction_log
+    monkeypatch.setattr(il, "_BATCH_SIZE", 4)
+    for i in range(10):
+        il.log_interaction("t1", "a1", f"q{i}", f"a{i}")
+    await _settle()
+
+    assert [len(b) for b in store["batches"]] == [4, 4, 2]
+    await il.flush_interaction_log()
+
+
+@pytest.mark.asyncio
+async def test_flush_on_shutdown_drains_queue_and_stops_drainer(interaction_log):
+    il, store = interaction_log
+    for i in range(3):
+        il.log_interaction("t1", "a1", f"q{i}", f"a{i}")
+
+    await il.flush_interaction_log()
+
+    assert sum(len(b) for b in store["batches"]) == 3
+    assert il._drainer is None
+    # Nothing running — flushing again is a no-op
+    await il.flush_interaction_log()
+
+
+@pytest.mark.asyncio
+async def test_db_error_drops_batch_but_drainer_keeps_running(interaction_log):
+    il, store = interaction_log
+    store["fail"] = 1
+    il.log_interaction("t1", "a1", "lost", "lost")
+    await _settle()
+    assert store["batches"] == []
+    assert not il._drainer.done()
+
+    il.log_interaction("t1", "a1", "kept", "kept")
+    await il.flush_interaction_log()
+    assert len(store["batches"]) == 1
+    assert '"kept"' in store["batches"][0][0]["transcript"]
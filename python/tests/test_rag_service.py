@@ -0,0 +1,190 @@
+"""
+Tests for app/services/rag_service.py
+"""
+import asyncio
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+
+def _unit(*values):
+    vec = np.asarray(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+# ── _build_context_text ───────────────────────────────────────────────────────
+
+def test_context_text_stays_within_budget(monkeypatch):
+    from app.config import settings
+    from app.services.rag_service import _build_context_text
+
+    monkeypatch.setattr(settings, "MAX_CONTEXT_CHARS", 10)
+
+    assert _build_context_text([{"content": "abc"}, {"content": "def"}, {"content": "ghi"}]) == "abc\n\ndef"
+    # A top chunk larger than the whole budget is truncated, not sent whole
+    assert _build_context_text([{"content": "x" * 30}, {"content": "y"}]) == "x" * 10
+
+
+# ── In-memory index ───────────────────────────────────────────────────────────
+
+class _CorpusCollection:
+    def __init__(self, on_get=None):
+        self._on_get = on_get
+
+    def get(self, **kwargs):
+        if self._on_get:
+            self._on_get()
+        return {"embeddings": [[1.0, 0.0]], "documents": ["doc"], "metadatas": [{}]}
+
+
+@pytest.fixture
+def inmem(monkeypatch):
+    from app.services import rag_service
+
+    monkeypatch.setattr(rag_service, "_inmem_indexes", type(rag_service._inmem_indexes)())
+    monkeypatch.setattr(rag_service, "_inmem_generations", {})
+    return rag_service
+
+
+def test_knowledge_base_ingest_invalidates_every_agent_in_tenant(inmem):
+    for tenant, agent in (("t1", "a1"), ("t1", "a2"), ("t2", "a1")):
+        inmem._get_inmem_index(_CorpusCollection(), tenant, agent, None)
+
+    inmem.invalidate_inmem_index("t1", "a1")
+    assert list(inmem._inmem_indexes) == ["t1:a2", "t2:a1"]
+
+    inmem.invalidate_inmem_index("t1", "knowledge_base")
+    assert list(inmem._inmem_indexes) == ["t2:a1"]
+
+
+def test_load_overlapping_invalidation_is_not_cached(inmem):
+    collection = _CorpusCollection(on_get=lambda: inmem.invalidate_inmem_index("t1", "a1"))
+
+    assert inmem._get_inmem_index(collection, "t1", "a1", None) is not None
+    assert "t1:a1" not in inmem._inmem_indexes
+
+
+# ── _SemanticCache ────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def semantic_settings(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_TTL", 60)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_THRESHOLD", 0.95)
+    return settings
+
+
+def test_semantic_cache_hits_on_near_duplicate_only(semantic_settings):
+    from app.services.rag_service import _SemanticCache
+
+    cache = _SemanticCache()
+    cache.put("t:a:m", _unit(1, 0, 0), {"response": "opening hours"})
+
+    assert cache.get("t:a:m", _unit(1, 0.05, 0)) == {"response": "opening hours"}
+    assert cache.get("t:a:m", _unit(0, 1, 0)) is None
+    # Namespaces are isolated per tenant/agent/model
+    assert cache.get("t:other:m", _unit(1, 0, 0)) is None
+
+
+def test_semantic_cache_entries_expire(semantic_settings, monkeypatch):
+    from app.services import rag_service
+    from app.services.rag_service import _SemanticCache
+
+    now = [1000.0]
+    monkeypatch.setattr(rag_service.time, "monotonic", lambda: now[0])
+    cache = _SemanticCache()
+    cache.put("t:a:m", _unit(1, 0), {"response": "old"})
+
+    now[0] += semantic_settings.SEMANTIC_CACHE_TTL + 1
+    assert cache.get("t:a:m", _unit(1, 0)) is None
+    assert "t:a:m" not in cache._entries
+
+
+def test_semantic_cache_evicts_least_recent_namespace(semantic_settings):
+    from app.services.rag_service import _SemanticCache
+
+    cache = _SemanticCache(max_entries=2, max_namespaces=2)
+    for ns in ("n1", "n2"):
+        cache.put(ns, _unit(1, 0), {"response": ns})
+    cache.put("n1", _unit(0, 1), {"response": "n1b"})  # n1 becomes most recent
+    cache.put("n3", _unit(1, 0), {"response": "n3"})
+
+    assert list(cache._entries) == ["n1", "n3"]
+    assert len(cache._entries["n1"]) == 2
+
+
+# ── _QueryBatcher ─────────────────────────────────────────────────────────────
+
+class _FakeCollection:
+    def __init__(self, fail=False):
+        self.calls = []
+        self._fail = fail
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.calls.append(len(query_embeddings))
+        if self._fail:
+            raise RuntimeError("chroma unavailable")
+        n = len(query_embeddings)
+        return {
+            "documents": [[f"doc{i}"] for i in range(n)],
+            "metadatas": [[{"i": i}] for i in range(n)],
+            "distances": [[0.1 * i] for i in range(n)],
+        }
+
+
+@pytest.fixture
+def fake_embedder(monkeypatch):
+    """Stand-in ingestion module so the batcher doesn't load the real embedder."""
+    module = types.SimpleNamespace(
+        embed_texts=lambda texts: [np.full(3, len(t), np.float32) for t in texts],
+    )
+    monkeypatch.setitem(sys.modules, "app.services.ingestion_service", module)
+
+
+@pytest.mark.asyncio
+async def test_query_batcher_coalesces_concurrent_queries(fake_embedder):
+    from app.services.rag_service import _QueryBatcher
+
+    batcher = _QueryBatcher(window=0.01)
+    collection = _FakeCollection()
+    results = await asyncio.gather(*(
+        batcher.submit(collection, ("t", "a", 3), f"q{i}", 3, None) for i in range(3)
+    ))
+
+    assert collection.calls == [3]
+    assert [r["documents"] for r in results] == [[["doc0"]], [["doc1"]], [["doc2"]]]
+    assert not batcher._tasks
+
+
+@pytest.mark.asyncio
+async def test_query_batcher_flushes_full_batch_before_window(fake_embedder):
+    from app.services.rag_service import _QueryBatcher
+
+    batcher = _QueryBatcher(window=60, max_batch=2)
+    collection = _FakeCollection()
+    results = await asyncio.wait_for(asyncio.gather(*(
+        batcher.submit(collection, ("t", "a", 3), f"q{i}", 3, None) for i in range(2)
+    )), timeout=1)
+
+    assert collection.calls == [2]
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_batcher_propagates_errors_to_every_caller(fake_embedder):
+    from app.services.rag_service import _QueryBatcher
+
+    batcher = _QueryBatcher(window=0.01)
+    collection = _FakeCollection(fail=True)
+    results = await asyncio.gather(*(
+        batcher.submit(collection, ("t", "a", 3), f"q{i}", 3, None) for i in range(2)
+    ), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not batcher._tasks
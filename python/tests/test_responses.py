@@ -0,0 +1,45 @@
+"""
+Tests for app/responses.py
+"""
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+
+def test_orjson_response_renders_compact_json():
+    from app.responses import OrjsonResponse
+
+    resp = OrjsonResponse({"status": "ok", "items": [1, 2], "name": "café"})
+
+    assert resp.body == b'{"status":"ok","items":[1,2],"name":"caf\xc3\xa9"}'
+    assert resp.headers["content-type"] == "application/json"
+    assert json.loads(resp.body) == {"status": "ok", "items": [1, 2], "name": "café"}
+
+
+def test_orjson_response_handles_non_str_keys_and_datetimes():
+    from app.responses import OrjsonResponse
+
+    stamp = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    resp = OrjsonResponse({1: "one", "at": stamp}, status_code=201)
+
+    assert resp.status_code == 201
+    assert json.loads(resp.body) == {"1": "one", "at": "2024-01-02T03:04:05+00:00"}
+
+
+def test_orjson_response_is_app_default():
+    from app.responses import OrjsonResponse
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI(default_response_class=OrjsonResponse)
+
+    @app.get("/counts")
+    async def counts():
+        return {2: "b", "total": 2}
+
+    resp = TestClient(app).get("/counts")
+    assert resp.status_code == 200
+    assert resp.json() == {"2": "b", "total": 2}
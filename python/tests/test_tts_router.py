@@ -3,6 +3,7 @@ Tests for app/services/tts_router.py
 """
 import os
 import sys
+
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
@@ -35,3 +36,12 @@ async def test_tts_supported_engines():
     # Not required to expose the attribute, but if it does it should contain kokoro
     if engines:
         assert "kokoro" in engines or "edge" in engines
+
+
+def test_pcm16_to_mulaw_g711_reference_values():
+    """μ-law encoding matches G.711: silence, positive and negative full scale."""
+    import struct
+
+    from app.services.tts_router import _pcm16_to_mulaw
+    pcm = struct.pack("<3h", 0, 32767, -32768)
+    assert _pcm16_to_mulaw(pcm) == bytes([0xFF, 0x80, 0x00])